@@ -0,0 +1,214 @@
+import os
+import csv
+import shutil
+import argparse
+from datetime import datetime, timedelta
+from fb_imageStore import ImageStore
+from fb_listingImages import DATA_ROOT, relative_image_path
+from fb_listing import CSV_FIELDS, read_listings_csv
+from fb_listingIndex import get_index, csv_file_date
+from fb_http import get_client
+
+# Old daily CSVs are merged into one archive; the data_ prefix keeps it in the listing index
+ARCHIVE_DIR = os.path.join(DATA_ROOT, "data_archive")
+ARCHIVE_FILE = os.path.join(ARCHIVE_DIR, "listings_archive.csv")
+ARCHIVE_FIELDS = CSV_FIELDS + ["file_date"]
+
+# Compaction settings
+RETENTION_DAYS = 30  # data_<date> directories older than this are compacted
+IMAGE_POLICY = "keep"  # "keep" all archived images, or drop those of "unpublished" listings
+LIVE_CHECK_BATCH = 200  # Listing ids checked per GraphQL request
+
+def find_old_data_dirs(retention_days=RETENTION_DAYS):
+    """Return (date, path) for every data_YYYY-MM-DD directory older than the retention period, oldest first."""
+    cutoff = (datetime.now() - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+    old_dirs = []
+    for name in sorted(os.listdir(DATA_ROOT)):
+        path = os.path.join(DATA_ROOT, name)
+        if not name.startswith("data_") or not os.path.isdir(path):
+            continue
+        date_str = name[len("data_"):]
+        try:
+            datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            continue
+        if date_str < cutoff:
+            old_dirs.append((date_str, path))
+    return old_dirs
+
+def directory_size(path):
+    """Return the total size in bytes of the files under a directory."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+def read_archive():
+    """Return the listings in the archive CSV, or an empty list if there is none yet."""
+    if not os.path.exists(ARCHIVE_FILE):
+        return []
+    return read_listings_csv(ARCHIVE_FILE)
+
+def write_archive(listings):
+    """Replace the archive CSV with the given listings, never leaving a half-written file."""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    tmp_path = f"{ARCHIVE_FILE}.tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=ARCHIVE_FIELDS)
+        writer.writeheader()
+        writer.writerows(listing.to_csv_dict() for listing in listings)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, ARCHIVE_FILE)
+
+def store_listing_images(listing, store):
+    """
+    Move a listing's images into the shared content-addressed store and point
+    its image entries at the stored objects. Identical images are stored once.
+    Returns the number of images stored.
+    """
+    entries = []
+    for entry in listing.images:
+        path = os.path.join(DATA_ROOT, relative_image_path(entry["path"]))
+        if not os.path.exists(path):
+            print(f"[⚠️] Image missing, dropping it from the archive: {entry['path']}")
+            continue
+        sha256 = store.add_object(path)
+        object_path = store.object_path(sha256)
+        entries.append({
+            "path": relative_image_path(object_path),
+            "size": os.path.getsize(object_path),
+            "sha256": sha256,
+        })
+    listing.set_images(entries)
+    return len(entries)
+
+def fetch_published_ids(listing_ids):
+    """Return the subset of listing ids that are still published on Yoodlize, checked in batches."""
+    listing_ids = sorted({int(listing_id) for listing_id in listing_ids if str(listing_id).isdigit()})
+    published = set()
+    for start in range(0, len(listing_ids), LIVE_CHECK_BATCH):
+        batch = listing_ids[start:start + LIVE_CHECK_BATCH]
+        graphql_query = """
+        query PublishedListings($ids: [Int!]) {
+            listing(where: {id: {_in: $ids}, is_published: {_eq: true}}) {
+                id
+            }
+        }
+        """
+        data = get_client().execute(graphql_query, {"ids": batch}, operation="published_listings")
+        published.update(str(listing["id"]) for listing in data.get("listing", []))
+    return published
+
+def prune_unpublished_images(listings, store):
+    """
+    Delete the stored images of archived listings that are no longer published.
+    Images still used by a published listing, or by a row without an id, are kept.
+    Returns (listings pruned, bytes freed).
+    """
+    published = fetch_published_ids(listing.id for listing in listings if listing.id)
+
+    keep = set()
+    unpublished = []
+    for listing in listings:
+        hashes = {entry.get("sha256") for entry in listing.images} - {None}
+        if listing.id and listing.id not in published:
+            unpublished.append((listing, hashes))
+        else:
+            keep |= hashes
+
+    pruned = 0
+    freed = 0
+    for listing, hashes in unpublished:
+        if not hashes:
+            continue
+        for sha256 in hashes - keep:
+            path = store.object_path(sha256)
+            if os.path.exists(path):
+                freed += os.path.getsize(path)
+                os.remove(path)
+        listing.set_images([])
+        pruned += 1
+    return pruned, freed
+
+def compact(retention_days=RETENTION_DAYS, image_policy=IMAGE_POLICY, dry_run=False):
+    """
+    Merge data_<date> directories older than retention_days into the archive CSV,
+    move their images into the shared store and delete the directories.
+    With image_policy "unpublished", images of archived listings that are no longer
+    published are deleted as well. Returns the number of directories compacted.
+    """
+    old_dirs = find_old_data_dirs(retention_days)
+    print(f"[🗜️] {len(old_dirs)} data directories older than {retention_days} days")
+    if dry_run:
+        for date_str, path in old_dirs:
+            print(f"   - {os.path.basename(path)} ({directory_size(path) / 1024 / 1024:.1f} MB)")
+        return 0
+
+    store = ImageStore()
+    listings = read_archive()
+    size_before = sum(directory_size(path) for _, path in old_dirs)
+    stored = 0
+    compacted = []
+
+    for date_str, path in old_dirs:
+        csv_files = [name for name in os.listdir(path) if name.startswith("listings_") and name.endswith(".csv")]
+        try:
+            dir_listings = []
+            for name in csv_files:
+                dir_listings += read_listings_csv(os.path.join(path, name), file_date=csv_file_date(name) or date_str)
+            for listing in dir_listings:
+                stored += store_listing_images(listing, store)
+            listings += dir_listings
+            compacted.append(path)
+        except Exception as e:
+            print(f"[❌] Could not compact {path}, leaving it in place: {e}")
+
+    # The same listing can be fetched on several days; keep its latest row
+    latest = {}
+    for listing in listings:
+        if listing.id:
+            if listing.id not in latest or listing.file_date >= latest[listing.id].file_date:
+                latest[listing.id] = listing
+    listings = [listing for listing in listings if not listing.id or latest[listing.id] is listing]
+
+    pruned = 0
+    freed = 0
+    if image_policy == "unpublished":
+        try:
+            pruned, freed = prune_unpublished_images(listings, store)
+        except Exception as e:
+            # Without an answer from the API nothing is known to be unpublished
+            print(f"[⚠️] Could not check which listings are published, keeping all images: {e}")
+
+    write_archive(listings)
+    store.save()
+
+    # Only remove directories once their rows and images are safely in the archive
+    for path in compacted:
+        shutil.rmtree(path)
+    get_index().refresh()
+
+    print(f"\n[📊] Compaction summary: {len(compacted)} directories ({size_before / 1024 / 1024:.1f} MB) merged into "
+          f"{os.path.relpath(ARCHIVE_FILE, DATA_ROOT)}, {len(listings)} archived listings, {stored} images stored, "
+          f"{pruned} unpublished listings pruned ({freed / 1024 / 1024:.1f} MB freed)")
+    return len(compacted)
+
+def parse_args():
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Compact old data directories into an archive and a shared image store.")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS,
+                        help=f"compact data directories older than this many days (default: {RETENTION_DAYS})")
+    parser.add_argument("--images", choices=["keep", "unpublished"], default=IMAGE_POLICY,
+                        help="keep all archived images, or delete those of listings no longer published "
+                             f"(default: {IMAGE_POLICY})")
+    parser.add_argument("--dry-run", action="store_true", help="only list the directories that would be compacted")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    compact(retention_days=args.days, image_policy=args.images, dry_run=args.dry_run)
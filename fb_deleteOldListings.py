@@ -1,8 +1,5 @@
-import os
 import time
-import csv
 import re
-import glob
 from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -13,6 +10,7 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 # Import functions from existing scripts
 from fb_postListings import get_driver, post_listing, reset_browser_state, handle_redirect_warning
+from fb_listingIndex import get_index, normalize_title
 
 def get_listing_date(date_text):
     """
@@ -290,87 +288,37 @@ def find_csv_data_for_listing(title, listing_date=None, debug=False):
         debug: Whether to print debug information
     
     Returns:
-        The CSV row data for the listing, or None if not found
+        The Listing record from the CSV files, or None if not found
     """
-    # Normalize the title for comparison
-    normalized_title = title.lower().replace("rent a ", "").strip()
-    
     if debug:
         print(f"[🔍] Looking for CSV data for listing: {title}")
-        print(f"[🔍] Normalized title: {normalized_title}")
+        print(f"[🔍] Normalized title: {normalize_title(title)}")
+    
+    index = get_index()
     
-    # First, try to find the CSV file based on listing date
+    # First, try the CSV file for the listing's date
     if listing_date:
         # The CSV file is typically created the day before the listing is posted
-        csv_date = listing_date - timedelta(days=1)
-        
-        # Get the directory and filename patterns
-        data_dir_pattern = f"data_{csv_date.strftime('%Y-%m-%d')}"
-        csv_file_pattern = f"listings_{csv_date.strftime('%Y-%m-%d')}.csv"
-        
-        # Full path to the expected CSV file
-        expected_csv_path = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), 
-            data_dir_pattern, 
-            csv_file_pattern
-        )
+        csv_date = (listing_date - timedelta(days=1)).strftime('%Y-%m-%d')
         
         if debug:
-            print(f"[🔍] Looking for CSV from date: {csv_date.strftime('%Y-%m-%d')}")
-            print(f"[🔍] Expected CSV path: {expected_csv_path}")
+            print(f"[🔍] Looking for CSV from date: {csv_date}")
         
-        # Check if this specific file exists
-        if os.path.exists(expected_csv_path):
+        row = index.find(title, file_date=csv_date)
+        if row:
             if debug:
-                print(f"[✅] Found date-matched CSV: {expected_csv_path}")
-            
-            try:
-                with open(expected_csv_path, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        row_title = row.get('title', '')
-                        row_normalized = row_title.lower().replace("rent a ", "").strip()
-                        
-                        # Check for title match
-                        if normalized_title == row_normalized or normalized_title in row_normalized or row_normalized in normalized_title:
-                            if debug:
-                                print(f"[✅] Found exact match in date-specific CSV for: {title}")
-                            return row
-            except Exception as e:
-                if debug:
-                    print(f"[⚠️] Error reading date-matched CSV: {e}")
+                print(f"[✅] Found exact match in date-specific CSV for: {title}")
+            return row
     
-    # If we didn't find a match based on date or date wasn't provided, 
-    # fall back to the original approach of searching all CSVs
+    # If we didn't find a match based on date or date wasn't provided, search all CSVs
     if debug:
         print(f"[ℹ️] No date match found, searching all CSVs...")
     
-    # Get all data directories (newest first)
-    data_dirs = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_*")), reverse=True)
-    
-    for data_dir in data_dirs:
-        # Find CSV files in the directory
-        csv_files = glob.glob(os.path.join(data_dir, "listings_*.csv"))
-        
-        for csv_file in csv_files:
-            if debug:
-                print(f"[🔍] Searching in {csv_file}")
-                
-            try:
-                with open(csv_file, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        row_title = row.get('title', '')
-                        row_normalized = row_title.lower().replace("rent a ", "").strip()
-                        
-                        # Use fuzzy matching for title comparison
-                        if normalized_title == row_normalized or normalized_title in row_normalized or row_normalized in normalized_title:
-                            if debug:
-                                print(f"[✅] Found matching CSV data in {csv_file} for: {title}")
-                            return row
-            except Exception as e:
-                if debug:
-                    print(f"[⚠️] Error reading {csv_file}: {e}")
+    row = index.find(title)
+    if row:
+        if debug:
+            print(f"[✅] Found matching CSV data in {row.csv_file} for: {title}")
+        return row
     
     print(f"[❌] Could not find CSV data for: {title}")
     return None
@@ -398,7 +346,9 @@ def delete_and_repost(driver, weeks_threshold=2, debug=False):
             # Find corresponding CSV data using the listing date
             csv_data = find_csv_data_for_listing(title, listing_date=date, debug=debug)
             
-            if csv_data:
+            if csv_data and csv_data.price is None:
+                print(f"[⚠️] Could not repost {title} - its CSV price is missing or unparsable")
+            elif csv_data:
                 print(f"[🔄] Reposting: {title}")
                 
                 # Reset browser state before posting
@@ -407,11 +357,11 @@ def delete_and_repost(driver, weeks_threshold=2, debug=False):
                 # Post the listing with same data
                 success = post_listing(
                     driver,
-                    title=csv_data.get('title', ''),
-                    price=csv_data.get('price', ''),
-                    description=csv_data.get('description', ''),
-                    location=csv_data.get('location'),
-                    images=csv_data.get('images')
+                    title=csv_data.title,
+                    price=csv_data.price,
+                    description=csv_data.description,
+                    location=csv_data.location,
+                    images=csv_data.image_paths
                 )
                 
                 if success:
@@ -1,8 +1,61 @@
 import os
 import csv
-import requests
+import json
+import argparse
+import itertools
 from datetime import datetime, timedelta
 import shutil
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fb_imageStore import ImageStore, ImageManifest, image_is_complete
+from fb_imagePrep import create_prep_pool, preprocess_images
+from fb_pipeline import run_pipeline
+from fb_http import get_client, create_session
+from fb_listingIndex import get_index
+from fb_listingImages import build_image_entries
+from fb_listing import Listing, CSV_FIELDS
+
+# Image download settings
+IMAGE_BASE_URL = "https://imagedelivery.net/yADbhFAVNAgt-DPVJpPhhg"
+# Cloudflare Images variant to request: a named variant from the dashboard, or
+# flexible-variant options sized to what Marketplace displays
+IMAGE_VARIANT = "w=2048,h=2048,fit=scale-down,quality=85,format=jpeg"
+FALLBACK_VARIANT = "public"  # Full-size original, always available
+VARIANT_MISSING_STATUSES = (400, 403, 404)  # Variant unknown or flexible variants disabled
+unavailable_variants = set()  # Variants refused for an image that /public served, skipped for the remaining images
+MAX_DOWNLOAD_WORKERS = 8  # Concurrent downloads sharing one connection pool
+PIPELINE_QUEUE_SIZE = 16  # Listings buffered between pipeline stages before backpressure kicks in
+DOWNLOAD_TIMEOUT = 30  # Seconds per image request
+
+# Listing query settings
+PAGE_SIZE = 100  # Listings per GraphQL page
+BACKFILL_WORKERS = 4  # Backfill shards fetched in parallel
+
+# High-water mark of the last listing processed, so each run only fetches newer listings
+WATERMARK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fetch_watermark.json")
+RETRY_LIMIT = 5  # Runs a listing whose photos failed is fetched again before it is dropped
+
+# Listing fields requested by every listing query
+LISTING_FIELDS = """
+            id
+            title
+            description
+            base_price
+            created_at
+            listing_addresses {
+                address_id
+                list_id
+                user_address {
+                    city
+                    state
+                    zipcode
+                }
+            }
+            listing_photos {
+                name
+            }
+"""
 
 def create_directory(directory):
     """Create directory if it doesn't exist."""
@@ -20,87 +73,320 @@ def format_csv_friendly_text(text):
         text = text.replace('\n', ' ')
     return text
 
-def query_database(start_date, end_date):
-    """Query the Hasura GraphQL database for listings within the date range."""
-    print(f"[🔍] Querying database for listings between {start_date} and {end_date}...")
+def fetch_listing_page(start_date, end_date, after=None, page_size=PAGE_SIZE):
+    """
+    Fetch one page of published listings created in [start_date, end_date), in (created_at, id) order.
+    `after` is the (created_at, id) keyset cursor of the last row already seen.
+    """
+    # Keyset condition: strictly after the cursor row, so pages never overlap or skip
+    cursor_filter = ""
+    if after:
+        after_created_at, after_id = after
+        cursor_filter = """,
+                _or: [
+                    {created_at: {_gt: %s}},
+                    {created_at: {_eq: %s}, id: {_gt: %s}}
+                ]""" % (json.dumps(after_created_at), json.dumps(after_created_at), json.dumps(after_id))
     
-    # The correct GraphQL query format
     graphql_query = """
     query PublishedListings {
         listing(
             where: {
                 is_published: {_eq: true},
-                created_at: {_gte: "%s", _lte: "%s"}
+                created_at: {_gte: "%s", _lt: "%s"}%s
             },
-            order_by: {created_at: desc}
-        ) {
-            id
-            title
-            description
-            base_price
-            created_at
-            listing_addresses {
-                address_id
-                list_id
-                user_address {
-                    city
-                    state
-                    zipcode
-                }
-            }
-            listing_photos {
-                name
-            }
-        }
+            order_by: [{created_at: asc}, {id: asc}],
+            limit: %d
+        ) {%s}
     }
-    """ % (start_date, end_date)
+    """ % (start_date, end_date, cursor_filter, page_size, LISTING_FIELDS)
     
-    # Payload for the POST request
-    payload = {
-        "query": graphql_query
-    }
+    # Make the API request through the shared client (pooling, retries, circuit breaker)
+    data = get_client().execute(graphql_query, operation="listings_page")
+    return data.get("listing", [])
+
+def query_database_pages(start_date, end_date, page_size=PAGE_SIZE, after=None):
+    """
+    Yield pages of listings within the date range, starting after the `after` cursor if given.
+    The next page is requested in the background while the caller works on the current one,
+    so at most two pages are held in memory at a time.
+    A failed query is raised to the caller rather than ending the listings early without notice.
+    """
+    print(f"[🔍] Querying database for listings between {start_date} and {end_date}...")
     
-    # Make the API request
-    try:
-        response = requests.post(
-            "https://yoodlize-hasura.herokuapp.com/v1/graphql",
-            headers={"Content-Type": "application/json"},
-            json=payload  # Using json parameter automatically handles JSON serialization
-        )
+    total = 0
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch_listing_page, start_date, end_date, after, page_size)
         
-        if response.status_code == 200:
-            data = response.json()
+        while future is not None:
+            try:
+                page = future.result()
+            except Exception as e:
+                print(f"[❌] Error querying database: {e}")
+                raise
             
-            # Debug response
-            if "data" not in data:
-                print(f"[⚠️] Unexpected response format: {data}")
-                return []
-                
-            listings = data.get("data", {}).get("listing", [])
-            print(f"[✅] Retrieved {len(listings)} listings from database")
+            # Prefetch the next page before handing this one to the caller
+            future = None
+            if len(page) == page_size:
+                last = page[-1]
+                cursor = (last.get("created_at"), last.get("id"))
+                future = executor.submit(fetch_listing_page, start_date, end_date, cursor, page_size)
             
-            # Debug first listing if available
-            if listings and len(listings) > 0:
-                print(f"[📄] First listing title: {listings[0].get('title', 'No title')}")
+            if page:
+                if total == 0:
+                    print(f"[📄] First listing title: {page[0].get('title', 'No title')}")
+                total += len(page)
+                print(f"[✅] Retrieved {len(page)} listings from database ({total} so far)")
+                yield page
+
+def fetch_listings_by_ids(listing_ids):
+    """Return the published listings with the given ids, in (created_at, id) order."""
+    if not listing_ids:
+        return []
+    graphql_query = """
+    query ListingsById($ids: [Int!]) {
+        listing(
+            where: {id: {_in: $ids}, is_published: {_eq: true}},
+            order_by: [{created_at: asc}, {id: asc}]
+        ) {%s}
+    }
+    """ % LISTING_FIELDS
+    data = get_client().execute(graphql_query, {"ids": [int(listing_id) for listing_id in listing_ids]},
+                                operation="listings_by_id")
+    return data.get("listing", [])
+
+def query_database(start_date, end_date, page_size=PAGE_SIZE, after=None):
+    """Yield listings within the date range one at a time, fetching them page by page."""
+    for page in query_database_pages(start_date, end_date, page_size, after):
+        yield from page
+
+def load_watermark(path=WATERMARK_FILE):
+    """
+    Return (cursor, retry): the persisted (created_at, id) of the last processed listing, or None,
+    and the {listing id: failed runs} of earlier listings whose photos failed to download.
+    """
+    if not os.path.exists(path):
+        return None, {}
+    
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return (data["created_at"], data["id"]), data.get("retry", {})
+    except Exception as e:
+        print(f"[⚠️] Could not read watermark {path}: {e}")
+        return None, {}
+
+def save_watermark(cursor, retry, path=WATERMARK_FILE):
+    """Persist the (created_at, id) of the last processed listing and the listings to retry."""
+    created_at, listing_id = cursor
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"created_at": created_at, "id": listing_id, "retry": retry}, f)
+    os.replace(tmp_path, path)
+    print(f"[🔖] Watermark advanced to listing {listing_id} ({created_at}), {len(retry)} listings to retry")
+
+class WatermarkTracker:
+    """
+    Track the furthest listing that, together with every listing before it, has been handled.
+    Listings may finish out of order; each is reported with its position in the query order.
+    A listing whose photos all failed to download doesn't hold the cursor back: it goes on
+    the retry list, is fetched again by id on the next runs and is dropped after RETRY_LIMIT runs.
+    The cursor only moves forward, so retried listings older than it never move it back.
+    """
+    
+    def __init__(self, start=None, retry=None):
+        self.next_seq = 0
+        self.pending = {}
+        self.cursor = start
+        self.retry = dict(retry or {})
+    
+    def done(self, seq, listing):
+        """Mark the listing at position seq as handled."""
+        self.pending[seq] = listing
+        
+        while self.next_seq in self.pending:
+            listing = self.pending.pop(self.next_seq)
+            self.next_seq += 1
+            if listing is None:
+                continue
             
-            return listings
-        else:
-            print(f"[❌] API request failed with status code: {response.status_code}")
-            print(f"[❌] Error response: {response.text}")
-            return []
+            listing_id = str(listing.get("id"))
+            if listing.get("listing_photos") and not listing.get("local_images"):
+                self.retry[listing_id] = self.retry.get(listing_id, 0) + 1
+                if self.retry[listing_id] >= RETRY_LIMIT:
+                    print(f"[🚫] Giving up on listing {listing_id} after {RETRY_LIMIT} runs without photos")
+                    del self.retry[listing_id]
+            else:
+                self.retry.pop(listing_id, None)
             
-    except Exception as e:
-        print(f"[❌] Error querying database: {e}")
-        return []
+            position = (listing.get("created_at"), listing.get("id"))
+            if self.cursor is None or position > tuple(self.cursor):
+                self.cursor = position
+
+def create_image_session(pool_size=MAX_DOWNLOAD_WORKERS):
+    """Create a requests session whose keep-alive pool is shared by all download workers."""
+    return create_session(pool_size)
+
+def download_image(session, image_url, local_path):
+    """
+    Download a single image to local_path.
+    The body is written to a temporary file that only replaces local_path once its length
+    matches Content-Length and the image's end marker is present, so a crash or timeout
+    never leaves a truncated file behind.
+    Returns (status_code, bytes_written, seconds) so callers can aggregate stats.
+    Raises IOError if the body is incomplete.
+    """
+    started = time.perf_counter()
+    part_path = f"{local_path}.part"
+    response = session.get(image_url, stream=True, timeout=DOWNLOAD_TIMEOUT)
+    try:
+        if response.status_code != 200:
+            return response.status_code, 0, time.perf_counter() - started
+        with open(part_path, 'wb') as f:
+            response.raw.decode_content = True
+            shutil.copyfileobj(response.raw, f)
+        
+        # Content-Length counts encoded bytes, so it can only be compared for identity encoding
+        written = os.path.getsize(part_path)
+        expected = response.headers.get("Content-Length")
+        if expected and not response.headers.get("Content-Encoding") and int(expected) != written:
+            raise IOError(f"incomplete body, got {written} of {expected} bytes")
+        if not image_is_complete(part_path):
+            raise IOError("image data is truncated")
+        
+        os.replace(part_path, local_path)
+    except Exception:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    finally:
+        response.close()
+    return response.status_code, written, time.perf_counter() - started
+
+def build_image_url(image_name, variant=IMAGE_VARIANT):
+    """Build the imagedelivery.net URL for an image in the given variant."""
+    return f"{IMAGE_BASE_URL}/{image_name}/{variant}"
+
+def image_variants(variant=IMAGE_VARIANT):
+    """Return the variants to try for an image, preferred first."""
+    if variant == FALLBACK_VARIANT or variant in unavailable_variants:
+        return [FALLBACK_VARIANT]
+    return [variant, FALLBACK_VARIANT]
+
+def image_store_key(image_name, variant):
+    """Key an image in the shared store by name and the variant its bytes came from."""
+    if variant == FALLBACK_VARIANT:
+        return image_name
+    return f"{image_name}/{variant}"
 
-def download_images(listings, base_dir):
-    """Download images for all listings."""
-    image_base_url = "https://imagedelivery.net/yADbhFAVNAgt-DPVJpPhhg"
+def fetch_image(session, store, manifest, image_name, local_path, variant=IMAGE_VARIANT):
+    """
+    Make sure local_path holds a complete copy of an image.
+    A verified file already listed in the day's manifest is kept as is, otherwise the image is
+    linked in from the shared store, and only on a cache miss is it downloaded. The sized
+    variant is requested first, falling back to /public when Cloudflare rejects it.
+    Returns (status_code, bytes_downloaded, seconds, cached, sha256 of local_path).
+    """
+    keys = [image_store_key(image_name, v) for v in [variant, FALLBACK_VARIANT]]
     
-    # Track successful downloads and errors
-    successful = 0
-    failed = 0
+    # Only one worker fetches a given image; the others wait and then hit the store
+    with store.fetch_lock(image_name):
+        if manifest.is_complete(image_name, local_path):
+            return 200, 0, 0.0, True, manifest.sha256(image_name)
+        
+        sha256 = store.link_into(keys, local_path)
+        if sha256:
+            manifest.record(image_name, local_path, sha256)
+            return 200, 0, 0.0, True, sha256
+        
+        status_code, size, seconds, sha256 = download_variants(session, store, image_name, local_path, variant)
+        if status_code == 200:
+            manifest.record(image_name, local_path, sha256)
+        return status_code, size, seconds, False, sha256
+
+def download_variants(session, store, image_name, local_path, variant=IMAGE_VARIANT):
+    """
+    Download an image, trying the sized variant before /public, and add it to the store.
+    Returns (status_code, bytes_downloaded, seconds, sha256).
+    """
+    variants = image_variants(variant)
+    total_seconds = 0.0
+    sha256 = None
+    rejected = None
+    for v in variants:
+        status_code, size, seconds = download_image(session, build_image_url(image_name, v), local_path)
+        total_seconds += seconds
+        
+        if status_code == 200:
+            sha256 = store.add(image_store_key(image_name, v), local_path)
+            if rejected:
+                # The image exists, so it was the variant that was refused: skip it from now on
+                unavailable_variants.add(rejected)
+            break
+        if status_code in VARIANT_MISSING_STATUSES and v != variants[-1]:
+            print(f"[↩️] Variant '{v}' unavailable for {image_name} (HTTP {status_code}), falling back to /{variants[-1]}")
+            rejected = v
+            continue
+        break
     
+    return status_code, size, total_seconds, sha256
+
+class DownloadStats:
+    """Thread-safe image download counters, summarized in one line."""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.successful = 0
+        self.failed = 0
+        self.cached = 0
+        self.total_bytes = 0
+        self.latencies = []
+    
+    def record(self, status_code, size, seconds, cached):
+        """Record the outcome of one image fetch."""
+        with self.lock:
+            if status_code != 200:
+                self.failed += 1
+            elif cached:
+                self.successful += 1
+                self.cached += 1
+            else:
+                self.successful += 1
+                self.total_bytes += size
+                self.latencies.append(seconds)
+    
+    def record_error(self):
+        """Record an image fetch that raised."""
+        with self.lock:
+            self.failed += 1
+    
+    def summary(self):
+        """Return the summary line with counts, throughput and per-image latency."""
+        with self.lock:
+            elapsed = time.perf_counter() - self.started
+            megabytes = self.total_bytes / (1024 * 1024)
+            throughput = megabytes / elapsed if elapsed > 0 else 0.0
+            latencies = sorted(self.latencies)
+            if latencies:
+                avg_ms = sum(latencies) / len(latencies) * 1000
+                p95_ms = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            else:
+                avg_ms = p95_ms = 0.0
+            
+            return (f"[📊] Image download summary: {self.successful} successful ({self.cached} from cache), "
+                    f"{self.failed} failed, {megabytes:.1f} MB in {elapsed:.1f}s ({throughput:.2f} MB/s), "
+                    f"latency avg {avg_ms:.0f} ms / p95 {p95_ms:.0f} ms")
+
+def download_images(listings, base_dir, max_workers=MAX_DOWNLOAD_WORKERS, session=None, store=None,
+                    variant=IMAGE_VARIANT, stats=None, manifest=None):
+    """
+    Download images for all listings using a bounded pool of workers and the shared image store.
+    Pass a shared DownloadStats to aggregate several calls; otherwise a summary is printed.
+    """
+    # Build the jobs up front so each result can be slotted back in its original order.
+    # An image shared between listings is fetched once and fanned out to every slot.
+    jobs = {}
     for listing in listings:
         listing_id = listing.get("id")
         photos = listing.get("listing_photos", [])
@@ -108,44 +394,69 @@ def download_images(listings, base_dir):
         if not photos:
             print(f"[⚠️] No photos for listing {listing_id}: {listing.get('title')}")
             continue
-            
-        # Create a list to store local image paths
-        listing["local_images"] = []
         
-        for idx, photo in enumerate(photos):
-            image_name = photo.get("name")
-            if not image_name:
-                continue
-                
-            # Construct image URL
-            image_url = f"{image_base_url}/{image_name}/public"
-            
+        image_names = [photo.get("name") for photo in photos if photo.get("name")]
+        
+        # Reserve one slot per photo to keep the listing's image order
+        listing["local_images"] = [None] * len(image_names)
+        
+        for idx, image_name in enumerate(image_names):
             # Construct local file path
             local_path = os.path.join(base_dir, f"{image_name}.jpg")
+            job = jobs.setdefault(image_name, {"local_path": local_path, "slots": []})
+            job["slots"].append((listing, idx))
+    
+    # Track successful downloads and errors
+    report = stats is None
+    if report:
+        stats = DownloadStats()
+    
+    owns_session = session is None
+    if owns_session:
+        session = create_image_session(max_workers)
+    if store is None:
+        store = ImageStore()
+    if manifest is None:
+        manifest = ImageManifest(base_dir)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(fetch_image, session, store, manifest, image_name, job["local_path"], variant): image_name
+                for image_name, job in jobs.items()
+            }
             
-            # Download the image
-            try:
-                response = requests.get(image_url, stream=True)
-                if response.status_code == 200:
-                    with open(local_path, 'wb') as f:
-                        response.raw.decode_content = True
-                        shutil.copyfileobj(response.raw, f)
-                    
-                    # Add to the listing's local images
-                    listing["local_images"].append(local_path)
-                    successful += 1
-                    
-                    # Only print for the first image of each listing
-                    # if idx == 0:
-                        # print(f"[📸] Downloaded image for: {listing.get('title')}")
-                else:
-                    print(f"[❌] Failed to download image {image_name}: HTTP {response.status_code}")
-                    failed += 1
-            except Exception as e:
-                print(f"[❌] Error downloading image {image_name}: {e}")
-                failed += 1
+            for future in as_completed(futures):
+                image_name = futures[future]
+                job = jobs[image_name]
+                try:
+                    status_code, size, seconds, was_cached, sha256 = future.result()
+                    stats.record(status_code, size, seconds, was_cached)
+                    if status_code == 200:
+                        # Add to each listing's local images in its original position,
+                        # with the hash already known so the CSV writer doesn't read the file again
+                        for listing, idx in job["slots"]:
+                            listing["local_images"][idx] = job["local_path"]
+                            if sha256:
+                                listing.setdefault("image_hashes", {})[job["local_path"]] = sha256
+                    else:
+                        print(f"[❌] Failed to download image {image_name}: HTTP {status_code}")
+                except Exception as e:
+                    print(f"[❌] Error downloading image {image_name}: {e}")
+                    stats.record_error()
+    finally:
+        if report:
+            store.save()
+        if owns_session:
+            session.close()
     
-    print(f"[📊] Image download summary: {successful} successful, {failed} failed")
+    # Drop the slots of images that failed
+    for listing in listings:
+        if "local_images" in listing:
+            listing["local_images"] = [path for path in listing["local_images"] if path]
+    
+    if report:
+        print(stats.summary())
     return listings
 
 # Add this function to sanitize text for BMP compatibility
@@ -167,15 +478,91 @@ def sanitize_for_bmp(text):
         
     return sanitized
 
-def create_csv(listings, output_file):
-    """Create a CSV file with listing information for Facebook Marketplace."""
-    print(f"[📝] Creating CSV file: {output_file}")
+def read_csv_ids(csv_file):
+    """Return the set of listing ids already written to a CSV file."""
+    with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+        return {row.get("id") for row in csv.DictReader(f) if row.get("id")}
+
+def listing_record(listing):
+    """Turn a listing from the GraphQL API into the Listing record written to the CSV."""
+    getTitle = listing.get("title", "")
+    # Sanitize title
+    getTitle = sanitize_for_bmp(getTitle)
+        
+    # Ensure title doesn't exceed 95 characters (including prefix)
+    prefix = 'Rent a '
+    max_title_length = 95
+    
+    # Check if title would be too long
+    if len(prefix + getTitle) > max_title_length:
+        # Truncate the title and add ellipsis
+        available_length = max_title_length - len(prefix) - 3  # 3 chars for "..."
+        getTitle = getTitle[:available_length] + "..."
+        print(f"[✂️] Truncated title: {getTitle}")
+    
+    title = f'{prefix}{getTitle}'
+    
+    # Get the random description and sanitize
+    random_desc = sanitize_for_bmp(get_random_description(getTitle))
+    
+    # Sanitize the main description from the database
+    main_desc = sanitize_for_bmp(format_csv_friendly_text(listing.get("description", "")))
+    
+    # Combine with line break marker
+    description = f'{random_desc} [BREAK] {main_desc}'
+    
+    price = int(listing.get("base_price", 0)/100)
+    
+    # Get location
+    location = ""
+    addresses = listing.get("listing_addresses", [])
+    if addresses and addresses[0].get("user_address"):
+        user_address = addresses[0]["user_address"]
+        city = sanitize_for_bmp(user_address.get("city", ""))
+        state = sanitize_for_bmp(user_address.get("state", ""))
+        zipcode = sanitize_for_bmp(user_address.get("zipcode", ""))
+        
+        if zipcode:
+            location = zipcode
+        elif city and state:
+            location = f"{city}, {state}"
+        elif city:
+            location = city
+    
+    # Image entries ({path, size, sha256} plus the downloaded "original" when resized), relative to the data root
+    originals = dict(zip(listing.get("local_images", []), listing.get("original_images", [])))
+    images = build_image_entries(listing.get("local_images", []), hashes=listing.get("image_hashes"),
+                                 originals=originals)
     
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+    return Listing(id=listing.get("id"), title=title, price=price, description=description,
+                   location=location, images=images)
+
+def create_csv(listings, output_file, append=False, write_lock=None):
+    """
+    Create a CSV file with listing information for Facebook Marketplace.
+    With append=True, rows are added to an existing file and listings already in it are skipped.
+    Listings already written to any other listings CSV are skipped too, so they are never posted twice.
+    write_lock serializes row writes when several runs append to the same file.
+    """
+    try:
+        existing_ids = get_index().ids()
+    except Exception as e:
+        print(f"[⚠️] Could not read listing index, only checking {output_file} for duplicates: {e}")
+        existing_ids = set()
+    if append and os.path.exists(output_file) and os.path.getsize(output_file) > 0:
+        existing_ids |= read_csv_ids(output_file)
+        mode = 'a'
+        print(f"[📝] Appending to CSV file: {output_file}")
+    else:
+        mode = 'w'
+        print(f"[📝] Creating CSV file: {output_file}")
+    
+    with open(output_file, mode, newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
         
         # Write header
-        writer.writerow(["id", "title", "price", "description", "images", "location"])
+        if mode == 'w':
+            writer.writerow(CSV_FIELDS)
         
         count = 0
         for listing in listings:
@@ -184,61 +571,189 @@ def create_csv(listings, output_file):
                 continue
 
             id = listing.get("id", "")
-
-            getTitle = listing.get("title", "")
-            # Sanitize title
-            getTitle = sanitize_for_bmp(getTitle)
-                
-            # Ensure title doesn't exceed 95 characters (including prefix)
-            prefix = 'Rent a '
-            max_title_length = 95
-            
-            # Check if title would be too long
-            if len(prefix + getTitle) > max_title_length:
-                # Truncate the title and add ellipsis
-                available_length = max_title_length - len(prefix) - 3  # 3 chars for "..."
-                getTitle = getTitle[:available_length] + "..."
-                print(f"[✂️] Truncated title: {getTitle}")
-            
-            title = f'{prefix}{getTitle}'
-            
-            # Get the random description and sanitize
-            random_desc = sanitize_for_bmp(get_random_description(getTitle))
-            
-            # Sanitize the main description from the database
-            main_desc = sanitize_for_bmp(format_csv_friendly_text(listing.get("description", "")))
             
-            # Combine with line break marker
-            description = f'{random_desc} [BREAK] {main_desc}'
-            
-            price = int(listing.get("base_price", 0)/100)
-            
-            # Get location
-            location = ""
-            addresses = listing.get("listing_addresses", [])
-            if addresses and addresses[0].get("user_address"):
-                user_address = addresses[0]["user_address"]
-                city = sanitize_for_bmp(user_address.get("city", ""))
-                state = sanitize_for_bmp(user_address.get("state", ""))
-                zipcode = sanitize_for_bmp(user_address.get("zipcode", ""))
-                
-                if zipcode:
-                    location = zipcode
-                elif city and state:
-                    location = f"{city}, {state}"
-                elif city:
-                    location = city
-            
-            # Use the first image for the listing
-            image_path = listing.get("local_images", [""])
+            # Skip listings written by an earlier run
+            if str(id) in existing_ids:
+                continue
+            existing_ids.add(str(id))
+
+            record = listing_record(listing)
             
-            # Write the row
-            writer.writerow([id, title, price, description, image_path, location])
+            # Write the row and flush it so it is on disk as soon as its images are
+            if write_lock:
+                with write_lock:
+                    writer.writerow(record.to_csv_values())
+                    f.flush()
+            else:
+                writer.writerow(record.to_csv_values())
+                f.flush()
             count += 1
     
-    print(f"[✅] Created CSV with {count} listings")
+    print(f"[✅] Wrote {count} new listings to CSV")
+    
+    # Keep the lookup index used by the reply and delete scripts current
+    if count:
+        try:
+            get_index().index_file(output_file)
+        except Exception as e:
+            print(f"[⚠️] Could not update listing index: {e}")
+    return count
+
+def run_fetch_pipeline(listings, images_dir, marketplace_dir, csv_file, tracker,
+                       workers=MAX_DOWNLOAD_WORKERS, queue_size=PIPELINE_QUEUE_SIZE,
+                       session=None, store=None, prep_pool=None, write_lock=None):
+    """
+    Run fetch → download → CSV as concurrent stages connected by bounded queues.
+    Each listing's row is written as soon as its images are downloaded and resized,
+    and a full queue makes the stage before it wait. Returns the number of rows written.
+    The session, store and process pool can be passed in to share them between runs;
+    otherwise they are created for this run and closed at the end.
+    """
+    owns_session = session is None
+    if owns_session:
+        session = create_image_session(workers)
+    if store is None:
+        store = ImageStore()
+    owns_prep_pool = prep_pool is None
+    if owns_prep_pool:
+        prep_pool = create_prep_pool()
+    download_stats = DownloadStats()
+    manifest = ImageManifest(images_dir)
+    
+    def prepare(listing):
+        # Each worker handles one listing at a time; the workers together bound concurrency.
+        # Downloaded images are resized on the process pool before the row is written,
+        # so the CSV points the posting step at the small marketplace-sized files
+        try:
+            download_images([listing], images_dir, max_workers=1, session=session, store=store,
+                            stats=download_stats, manifest=manifest)
+            preprocess_images([listing], marketplace_dir, prep_pool, report=False)
+        except Exception as e:
+            # Handed on without images, so the tracker puts it on the retry list
+            print(f"[❌] Error preparing listing {listing.get('id')}: {e}")
+            listing["local_images"] = []
+        return listing
+    
+    def write(results):
+        def rows():
+            for seq, listing in results:
+                if listing is not None:
+                    yield listing
+                # Resumes only after create_csv has written and flushed the row
+                tracker.done(seq, listing)
+        return create_csv(rows(), csv_file, append=True, write_lock=write_lock)
+    
+    try:
+        count, stage_stats = run_pipeline(listings, prepare, write, workers=workers, queue_size=queue_size)
+    finally:
+        store.save()
+        if owns_session:
+            session.close()
+        if owns_prep_pool and prep_pool:
+            prep_pool.shutdown()
+    
+    print(download_stats.summary())
+    for stats in stage_stats:
+        print(stats.summary())
     return count
 
+def shard_windows(start_day, end_day, shard="day"):
+    """
+    Split the days from start_day to end_day (inclusive) into per-day or per-hour [start, end) windows.
+    Each window ends where the next one starts, so no listing falls between two shards.
+    """
+    step = timedelta(hours=1) if shard == "hour" else timedelta(days=1)
+    current = start_day
+    stop = end_day + timedelta(days=1)
+    while current < stop:
+        yield current, min(current + step, stop)
+        current += step
+
+def format_query_time(moment):
+    """Format a datetime the way the listing query expects it."""
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "+00:00"
+
+def backfill(start_day, end_day, shard="day", max_workers=BACKFILL_WORKERS):
+    """
+    Rebuild the data directories for listings created from start_day to end_day (inclusive).
+    The range is split into per-day or per-hour shards and up to max_workers shards run the
+    fetch pipeline at once, sharing one connection pool, image store and process pool.
+    Like the daily run, listings created on day D go to data_<D+1>, the day they are posted.
+    The incremental watermark is left untouched.
+    """
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+    windows = list(shard_windows(start_day, end_day, shard))
+    print(f"[🗂️] Backfilling {start_day.strftime('%Y-%m-%d')} to {end_day.strftime('%Y-%m-%d')} "
+          f"as {len(windows)} {shard} shards, {max_workers} at a time")
+    
+    # Split the download concurrency between the shards running at once
+    shard_workers = max(2, MAX_DOWNLOAD_WORKERS // max_workers)
+    session = create_image_session(MAX_DOWNLOAD_WORKERS)
+    store = ImageStore()
+    prep_pool = create_prep_pool()
+    
+    # Create each day's directory and CSV header up front; hour shards of one day then append
+    # to the same file, one row at a time under that file's lock
+    targets = {}
+    for window_start, _ in windows:
+        date_str = (window_start + timedelta(days=1)).strftime("%Y-%m-%d")
+        if date_str not in targets:
+            base_dir = create_directory(os.path.join(root_dir, f"data_{date_str}"))
+            images_dir = create_directory(os.path.join(base_dir, "images"))
+            csv_file = os.path.join(base_dir, f"listings_{date_str}.csv")
+            create_csv([], csv_file, append=True)
+            targets[date_str] = {
+                "images_dir": images_dir,
+                "marketplace_dir": os.path.join(images_dir, "marketplace"),
+                "csv_file": csv_file,
+                "lock": threading.Lock(),
+            }
+    
+    def run_shard(window):
+        window_start, window_end = window
+        target = targets[(window_start + timedelta(days=1)).strftime("%Y-%m-%d")]
+        query_errors = []
+        
+        def listings():
+            # The pipeline's fetch stage only logs errors; keep them so the shard counts as failed
+            try:
+                yield from query_database(format_query_time(window_start), format_query_time(window_end))
+            except Exception as e:
+                query_errors.append(e)
+                raise
+        
+        count = run_fetch_pipeline(
+            listings(), target["images_dir"], target["marketplace_dir"], target["csv_file"], WatermarkTracker(),
+            workers=shard_workers, session=session, store=store, prep_pool=prep_pool, write_lock=target["lock"]
+        )
+        if query_errors:
+            raise RuntimeError(f"listing query failed after {count} rows: {query_errors[0]}")
+        return count
+    
+    started = time.perf_counter()
+    total = 0
+    failed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(run_shard, window): window for window in windows}
+            for future in as_completed(futures):
+                window_start, window_end = futures[future]
+                try:
+                    total += future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"[❌] Shard {window_start} – {window_end} failed: {e}")
+    finally:
+        session.close()
+        if prep_pool:
+            prep_pool.shutdown()
+    
+    print(f"\n[📊] Backfill summary: {len(windows) - failed}/{len(windows)} shards, "
+          f"{total} new listings in {time.perf_counter() - started:.1f}s")
+    for line in get_client().latency_report():
+        print(line)
+    return total
+
 def get_random_description(title):
     """Generate a random description for the listing."""
     i = hash(title) % 5  # Simple hash to get a number between 0 and 4
@@ -266,10 +781,16 @@ def main():
         
         today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         
+        # Fetch everything created since the last processed listing, up to now.
+        # Without a watermark (first run) start from midnight of yesterday.
+        watermark, retry = load_watermark()
+        end_date = datetime.now()
+        start_date = today - timedelta(days=1)  # 00:00:00 of yesterday
+        
         # if choice == "1":
             # Yesterday
-        end_date = today - timedelta(seconds=1)  # 23:59:59 of yesterday
-        start_date = end_date.replace(hour=0, minute=0, second=0)  # 00:00:00 of yesterday
+        # end_date = today - timedelta(seconds=1)  # 23:59:59 of yesterday
+        # start_date = end_date.replace(hour=0, minute=0, second=0)  # 00:00:00 of yesterday
         # elif choice == "2":
         #     # Today
         #     start_date = today
@@ -294,29 +815,50 @@ def main():
             # start_date = end_date.replace(hour=0, minute=0, second=0)
         
         # Format dates for query
-        start_date_str = start_date.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "+00:00"
-        end_date_str = end_date.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "+00:00"
+        start_date_str = format_query_time(start_date)
+        end_date_str = format_query_time(end_date)
         
-        print(f"\n[📅] Fetching listings from {start_date.strftime('%Y-%m-%d %H:%M:%S')} to {end_date.strftime('%Y-%m-%d %H:%M:%S')}")
+        if watermark:
+            start_date_str = watermark[0]
+            print(f"\n[📅] Fetching listings created after listing {watermark[1]} ({watermark[0]}) up to {end_date.strftime('%Y-%m-%d %H:%M:%S')}")
+        else:
+            print(f"\n[📅] Fetching listings from {start_date.strftime('%Y-%m-%d %H:%M:%S')} to {end_date.strftime('%Y-%m-%d %H:%M:%S')}")
         
         # Create directory for today's date
         date_str = datetime.now().strftime("%Y-%m-%d")
         base_dir = create_directory(os.path.join(os.path.dirname(os.path.abspath(__file__)), f"data_{date_str}"))
         images_dir = create_directory(os.path.join(base_dir, "images"))
+        marketplace_dir = os.path.join(images_dir, "marketplace")
         
-        # Query the database
-        listings = query_database(start_date_str, end_date_str)
+        # Listings whose photos failed on earlier runs go first, then everything new.
+        # Query, download and CSV writing run as overlapping pipeline stages
+        retry_listings = []
+        if retry:
+            print(f"[🔁] Retrying {len(retry)} listings whose photos failed before")
+            try:
+                retry_listings = fetch_listings_by_ids(list(retry))
+                # Listings unpublished since then are not retried any more
+                found = {str(listing.get("id")) for listing in retry_listings}
+                retry = {listing_id: runs for listing_id, runs in retry.items() if listing_id in found}
+            except Exception as e:
+                print(f"[⚠️] Could not fetch the listings to retry, keeping them for the next run: {e}")
+        listings = itertools.chain(retry_listings,
+                                   query_database(start_date_str, end_date_str, after=watermark))
+        csv_file = os.path.join(base_dir, f"listings_{date_str}.csv")
         
-        if not listings:
-            print("[⚠️] No listings found for the specified date range.")
-            return
+        tracker = WatermarkTracker(start=watermark, retry=retry)
+        count = run_fetch_pipeline(listings, images_dir, marketplace_dir, csv_file, tracker)
         
-        # Download images
-        listings_with_images = download_images(listings, images_dir)
+        # Only move the watermark once the rows are safely on disk
+        if tracker.cursor:
+            save_watermark(tracker.cursor, tracker.retry)
         
-        # Create CSV file
-        csv_file = os.path.join(base_dir, f"listings_{date_str}.csv")
-        create_csv(listings_with_images, csv_file)
+        for line in get_client().latency_report():
+            print(line)
+        
+        if not count:
+            print("[⚠️] No new listings since the last run.")
+            return
         
         print("\n[🎉] Data fetch complete!")
         print(f"[📁] CSV file: {csv_file}")
@@ -328,5 +870,26 @@ def main():
     
     print("\n[👋] Done!")
 
+def parse_args():
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Fetch Yoodlize listings and prepare them for posting.")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"),
+                        help="rebuild data directories for listings created from START to END (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--shard", choices=["day", "hour"], default="day",
+                        help="backfill window size (default: day)")
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS,
+                        help=f"backfill shards run at once (default: {BACKFILL_WORKERS})")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.backfill:
+        try:
+            start_day = datetime.strptime(args.backfill[0], "%Y-%m-%d")
+            end_day = datetime.strptime(args.backfill[1], "%Y-%m-%d")
+        except ValueError:
+            print("[❌] Invalid date format. Use YYYY-MM-DD.")
+        else:
+            backfill(start_day, end_day, shard=args.shard, max_workers=args.workers)
+    else:
+        main()
\ No newline at end of file
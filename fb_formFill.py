@@ -0,0 +1,77 @@
+# Browser-side routine that fills every labelled text field of the listing form in one call.
+# arguments[0] is a list of {name, label, tag, value}; returns {name: {found, ok, value}}.
+FILL_FORM_SCRIPT = """
+var fields = arguments[0];
+var report = {};
+
+function findLabel(text) {
+    // Prefer an element whose own text is exactly the label, then one that contains it
+    var exact = document.evaluate("//*[text()[normalize-space()='" + text + "']]", document, null,
+                                  XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (exact) return exact;
+    return document.evaluate("//*[contains(text(), '" + text + "')]", document, null,
+                             XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function findInput(label, tag) {
+    var selector = tag === 'textarea' ? 'textarea' : 'input[type="text"], input:not([type])';
+    var wrapper = label.closest('label');
+    if (wrapper) {
+        var inside = wrapper.querySelector(selector);
+        if (inside) return inside;
+    }
+    var xpath = tag === 'textarea' ? 'following::textarea' : "following::input[not(@type) or @type='text']";
+    return document.evaluate(xpath, label, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+for (var i = 0; i < fields.length; i++) {
+    var field = fields[i];
+    var label = findLabel(field.label);
+    var input = label ? findInput(label, field.tag) : null;
+    if (!input) {
+        report[field.name] = {found: false, ok: false, value: null};
+        continue;
+    }
+
+    // React ignores plain .value assignments; the prototype setter plus input/change events update its state
+    var proto = input.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    var setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+    input.focus();
+    setter.call(input, field.value);
+    input.dispatchEvent(new Event('input', {bubbles: true}));
+    input.dispatchEvent(new Event('change', {bubbles: true}));
+    input.blur();
+
+    report[field.name] = {found: true, ok: input.value === field.value, value: input.value};
+}
+return report;
+"""
+
+def form_field(name, label, value, tag="input"):
+    """Describe one form field for fill_form: the label text shown next to it and the value to set."""
+    return {"name": name, "label": label, "tag": tag, "value": str(value)}
+
+def fill_form(driver, fields, debug=False):
+    """
+    Fill the given form_field()s with one execute_script call.
+    Returns {name: {"found", "ok", "value"}}; fields that are not "ok" need a Selenium fallback.
+    """
+    try:
+        report = driver.execute_script(FILL_FORM_SCRIPT, fields) or {}
+    except Exception as e:
+        print(f"[⚠️] Form fill script failed, falling back to Selenium for every field: {e}")
+        report = {}
+
+    for field in fields:
+        result = report.setdefault(field["name"], {"found": False, "ok": False, "value": None})
+        if result["ok"]:
+            if debug:
+                print(f"[✅] {field['label']} set in the form fill")
+        elif result["found"]:
+            print(f"[⚠️] {field['label']} did not keep its value (expected {field['value']!r}, found {result['value']!r})")
+        else:
+            print(f"[⚠️] {field['label']} field not found by the form fill")
+
+    filled = sum(1 for field in fields if report[field["name"]]["ok"])
+    print(f"[🧾] Form fill: {filled}/{len(fields)} fields set in one pass")
+    return report
@@ -0,0 +1,197 @@
+import time
+import random
+import bisect
+import threading
+import requests
+
+# Yoodlize's Hasura GraphQL endpoint
+HASURA_URL = "https://yoodlize-hasura.herokuapp.com/v1/graphql"
+
+# Client defaults
+CONNECT_TIMEOUT = 5  # Seconds to establish a connection
+READ_TIMEOUT = 30  # Seconds to wait for a response
+MAX_RETRIES = 4  # Retries after the first attempt
+BACKOFF_BASE = 0.5  # Seconds; the backoff ceiling doubles on every retry
+BACKOFF_MAX = 8  # Seconds; upper bound on a single backoff
+FAILURE_THRESHOLD = 5  # Consecutive failed calls that open the circuit
+RESET_TIMEOUT = 30  # Seconds the circuit stays open before a trial call
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class HasuraError(Exception):
+    """The Hasura endpoint returned an error or an unusable response."""
+
+class CircuitOpenError(HasuraError):
+    """Calls are refused because the endpoint failed repeatedly."""
+
+class LatencyHistogram:
+    """Thread-safe histogram of call latencies with fixed millisecond buckets."""
+
+    BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.total = 0
+        self.total_seconds = 0.0
+
+    def observe(self, seconds):
+        """Record one call."""
+        index = bisect.bisect_left(self.BUCKETS_MS, seconds * 1000)
+        with self.lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.total_seconds += seconds
+
+    def as_dict(self):
+        """Return the bucket counts keyed by upper bound ("+inf" for the overflow bucket)."""
+        with self.lock:
+            labels = [f"<={bound}ms" for bound in self.BUCKETS_MS] + ["+inf"]
+            return dict(zip(labels, self.counts))
+
+    def summary(self):
+        """Return a one-line summary of the histogram."""
+        with self.lock:
+            if not self.total:
+                return "no calls"
+            avg_ms = self.total_seconds / self.total * 1000
+        buckets = ", ".join(f"{label}: {count}" for label, count in self.as_dict().items() if count)
+        return f"{self.total} calls, avg {avg_ms:.0f} ms ({buckets})"
+
+class HasuraClient:
+    """
+    Reusable client for the Hasura GraphQL endpoint.
+
+    One pooled keep-alive session with gzip responses and bounded timeouts.
+    Transient failures are retried with jittered exponential backoff, and after
+    FAILURE_THRESHOLD consecutive failed calls the circuit opens and calls fail
+    fast until RESET_TIMEOUT has passed. Latencies are kept per operation name.
+    """
+
+    def __init__(self, url=HASURA_URL, pool_size=10, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 max_retries=MAX_RETRIES, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.session = create_session(pool_size)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+
+        self.lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.histograms = {}
+
+    def histogram(self, operation):
+        """Return the latency histogram for an operation, creating it on first use."""
+        with self.lock:
+            return self.histograms.setdefault(operation, LatencyHistogram())
+
+    def check_circuit(self):
+        """Raise CircuitOpenError while the circuit is open."""
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError(f"Hasura circuit open after {self.consecutive_failures} consecutive failures")
+            # Half-open: let this call through as a trial
+            self.opened_at = None
+
+    def record_result(self, success):
+        """Update the circuit breaker after a call."""
+        with self.lock:
+            if success:
+                self.consecutive_failures = 0
+                self.opened_at = None
+                return
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                print(f"[🔌] Hasura circuit opened for {self.reset_timeout}s after {self.consecutive_failures} failures")
+
+    def backoff(self, attempt):
+        """Sleep for a random time up to an exponentially growing ceiling (full jitter)."""
+        ceiling = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+        time.sleep(random.uniform(0, ceiling))
+
+    def execute(self, query, variables=None, operation="graphql", timeout=None, max_retries=None):
+        """
+        Run a GraphQL query and return its "data" object.
+        timeout and max_retries override the client defaults for callers with their own deadline.
+        Raises HasuraError when the call fails after all retries or the response has errors.
+        """
+        self.check_circuit()
+        if timeout is None:
+            timeout = self.timeout
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+
+        histogram = self.histogram(operation)
+        last_error = None
+
+        for attempt in range(max_retries + 1):
+            if attempt > 0:
+                self.backoff(attempt - 1)
+
+            started = time.perf_counter()
+            try:
+                response = self.session.post(self.url, json=payload, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                histogram.observe(time.perf_counter() - started)
+                last_error = HasuraError(f"request failed: {e}")
+                continue
+            histogram.observe(time.perf_counter() - started)
+
+            if response.status_code in RETRY_STATUSES:
+                last_error = HasuraError(f"HTTP {response.status_code}: {response.text[:200]}")
+                continue
+
+            if response.status_code != 200:
+                # Not transient; retrying will not help
+                self.record_result(False)
+                raise HasuraError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+            self.record_result(True)
+
+            body = response.json()
+            if body.get("errors"):
+                raise HasuraError(f"GraphQL errors: {body['errors']}")
+            if "data" not in body:
+                raise HasuraError(f"Unexpected response format: {body}")
+            return body["data"]
+
+        self.record_result(False)
+        raise last_error
+
+    def latency_report(self):
+        """Return one summary line per operation."""
+        with self.lock:
+            operations = sorted(self.histograms.items())
+        return [f"[⏱️] Hasura {name}: {histogram.summary()}" for name, histogram in operations]
+
+def create_session(pool_size=10):
+    """Create a requests session with a keep-alive pool of the given size."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+shared_client = None
+shared_client_lock = threading.Lock()
+
+def get_client():
+    """Return the process-wide HasuraClient, creating it on first use."""
+    global shared_client
+    with shared_client_lock:
+        if shared_client is None:
+            shared_client = HasuraClient()
+        return shared_client
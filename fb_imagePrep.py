@@ -0,0 +1,110 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from fb_imageStore import file_sha256
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it images are uploaded as downloaded
+    Image = None
+    ImageOps = None
+
+# Marketplace never displays photos larger than this on their longest edge
+MAX_IMAGE_EDGE = 2048
+JPEG_QUALITY = 85
+
+def prepare_image(source, dest, max_edge=MAX_IMAGE_EDGE, quality=JPEG_QUALITY):
+    """
+    Downscale, strip metadata from and re-encode one image. A JPEG that is already within
+    max_edge and carries no EXIF block is kept as is.
+    Runs inside a worker process, so it only takes and returns plain values.
+    Returns (path_to_upload, original_bytes, derived_bytes, sha256 of the derived file);
+    the hash is None when the original is kept, since the caller already knows it.
+    """
+    original_bytes = os.path.getsize(source)
+
+    # A previous run already produced this file
+    if os.path.exists(dest) and os.path.getmtime(dest) >= os.path.getmtime(source):
+        return dest, original_bytes, os.path.getsize(dest), file_sha256(dest)
+
+    with Image.open(source) as img:
+        # The sized Cloudflare variant is already a small, metadata-free JPEG; re-encoding it
+        # would only add another round of compression loss
+        if img.format == "JPEG" and max(img.size) <= max_edge and not img.info.get("exif"):
+            return source, original_bytes, original_bytes, None
+
+        # Apply the EXIF rotation before the EXIF block is dropped
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        # Write to a temp name so an interrupted run never leaves a truncated file
+        tmp_path = f"{dest}.{os.getpid()}.tmp"
+        img.save(tmp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+
+    derived_bytes = os.path.getsize(tmp_path)
+
+    # Small originals can grow when re-encoded; keep the original in that case
+    if derived_bytes >= original_bytes:
+        os.remove(tmp_path)
+        return source, original_bytes, original_bytes, None
+
+    # Hashed here, in the worker, so the single CSV writer thread doesn't have to
+    sha256 = file_sha256(tmp_path)
+    os.replace(tmp_path, dest)
+    return dest, original_bytes, derived_bytes, sha256
+
+def create_prep_pool(max_workers=None):
+    """Return a process pool for preprocessing, or None when Pillow is not installed."""
+    if Image is None:
+        print("[⚠️] Pillow not installed, images will be uploaded at full size")
+        return None
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+def preprocess_images(listings, output_dir, executor, report=True):
+    """
+    Resize and recompress every downloaded image of the given listings.
+    Each listing keeps its downloaded files in "original_images" and
+    "local_images" is replaced with the derived files, in the same order.
+    The derived files' hashes are added to the listing's "image_hashes".
+    """
+    if executor is None:
+        return listings
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # One job per source file, even when several listings share an image
+    jobs = {}
+    for listing in listings:
+        sources = listing.get("local_images")
+        if not sources:
+            continue
+
+        listing["original_images"] = list(sources)
+        for idx, source in enumerate(sources):
+            if source not in jobs:
+                dest = os.path.join(output_dir, os.path.basename(source))
+                jobs[source] = {"future": executor.submit(prepare_image, source, dest), "slots": []}
+            jobs[source]["slots"].append((listing, idx))
+
+    processed = 0
+    original_total = 0
+    derived_total = 0
+    for source, job in jobs.items():
+        try:
+            path, original_bytes, derived_bytes, sha256 = job["future"].result()
+            for listing, idx in job["slots"]:
+                listing["local_images"][idx] = path
+                if sha256:
+                    listing.setdefault("image_hashes", {})[path] = sha256
+            processed += 1
+            original_total += original_bytes
+            derived_total += derived_bytes
+        except Exception as e:
+            # Fall back to the original file so the listing still posts
+            print(f"[⚠️] Could not preprocess {source}: {e}")
+
+    if jobs and report:
+        print(f"[🖼️] Image preprocessing summary: {processed}/{len(jobs)} images, "
+              f"{original_total / (1024 * 1024):.1f} MB → {derived_total / (1024 * 1024):.1f} MB")
+    return listings
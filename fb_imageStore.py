@@ -0,0 +1,233 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from fb_jsonLines import JsonLines
+
+# Global content-addressed image store shared by every data_YYYY-MM-DD directory
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "image_store")
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def image_is_complete(path):
+    """
+    Check that an image file is not truncated by looking at its format's start and end markers.
+    JPEG must end with the EOI marker, PNG with its IEND chunk, and WebP must match its RIFF size.
+    Files in other formats pass as long as they are not empty.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return False
+
+    with open(path, 'rb') as f:
+        head = f.read(16)
+        f.seek(max(0, size - 32))
+        tail = f.read()
+
+    if head[:2] == b'\xff\xd8':
+        # Some encoders pad the file after the end-of-image marker
+        return tail.rstrip(b'\x00').endswith(b'\xff\xd9')
+    if head[:8] == b'\x89PNG\r\n\x1a\n':
+        return tail.endswith(b'IEND\xaeB`\x82')
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return int.from_bytes(head[4:8], 'little') + 8 == size
+    return True
+
+def link_or_copy(source, dest):
+    """
+    Point dest at the same bytes as source.
+    Uses a hardlink when the filesystem allows it and falls back to a copy.
+    Returns True if a hardlink was created.
+    """
+    if os.path.exists(dest) and os.path.samefile(source, dest):
+        return True
+
+    # Link to a temporary name first so dest is never left half-written
+    tmp_path = f"{dest}.link-tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    try:
+        os.link(source, tmp_path)
+        linked = True
+    except OSError:
+        shutil.copy2(source, tmp_path)
+        linked = False
+
+    os.replace(tmp_path, dest)
+    return linked
+
+class ImageStore:
+    """
+    Content-addressed image store.
+
+    Objects live at objects/<sha[:2]>/<sha>.jpg and index.json maps each
+    Cloudflare image name to the hash of its bytes, so a name seen before is
+    a cache hit and identical bytes under different names are stored once.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.json")
+        self.lock = threading.Lock()
+        self.fetch_locks = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self.index = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except Exception as e:
+                print(f"[⚠️] Could not read image store index, starting fresh: {e}")
+
+    def object_path(self, sha256):
+        """Return the path where an object with the given hash is stored."""
+        return os.path.join(self.objects_dir, sha256[:2], f"{sha256}.jpg")
+
+    def fetch_lock(self, image_name):
+        """Return the lock that serializes fetching a given image across worker threads."""
+        with self.lock:
+            return self.fetch_locks.setdefault(image_name, threading.Lock())
+
+    def lookup(self, image_name):
+        """Return the stored object path for an image name, or None on a miss."""
+        with self.lock:
+            entry = self.index.get(image_name)
+
+        if entry:
+            path = self.object_path(entry["sha256"])
+            if os.path.exists(path):
+                return path
+        return None
+
+    def link_into(self, image_names, dest):
+        """
+        Link a cached image into dest. image_names is one key or a list of
+        keys tried in order. Returns the content hash on a cache hit, None on a miss.
+        """
+        if isinstance(image_names, str):
+            image_names = [image_names]
+
+        path = None
+        for image_name in image_names:
+            path = self.lookup(image_name)
+            if path and not image_is_complete(path):
+                # Stored before downloads were verified; drop it and fetch again
+                print(f"[⚠️] Stored image {image_name} is corrupt, discarding")
+                self.forget(image_name)
+                path = None
+            if path:
+                break
+
+        with self.lock:
+            if path:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if not path:
+            return None
+
+        link_or_copy(path, dest)
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def forget(self, image_name):
+        """Remove an image name from the index."""
+        with self.lock:
+            if self.index.pop(image_name, None) is not None:
+                self.dirty = True
+
+    def add(self, image_name, path):
+        """
+        Add a freshly downloaded file to the store under image_name.
+        If the same bytes are already stored, path is replaced with a link to
+        the existing object so the duplicate stops using disk.
+        Returns the content hash.
+        """
+        sha256 = self.add_object(path)
+        with self.lock:
+            self.index[image_name] = {"sha256": sha256, "size": os.path.getsize(self.object_path(sha256))}
+            self.dirty = True
+        return sha256
+
+    def add_object(self, path):
+        """
+        Store a file's bytes by hash without naming it. If the same bytes are
+        already stored, path is replaced with a link to the existing object.
+        Returns the content hash.
+        """
+        sha256 = file_sha256(path)
+        target = self.object_path(sha256)
+
+        with self.lock:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.exists(target):
+                link_or_copy(target, path)
+            else:
+                link_or_copy(path, target)
+
+        return sha256
+
+    def save(self):
+        """Persist the name → hash index if it changed."""
+        with self.lock:
+            if not self.dirty:
+                return
+
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
+
+class ImageManifest:
+    """
+    Append-only record of the images completely downloaded into one images directory.
+
+    Each line of manifest.jsonl holds an image name with the size and hash of
+    its file. A restarted fetch trusts a file only if it is listed here and
+    still matches, so interrupted or corrupt downloads are fetched again.
+    """
+
+    def __init__(self, images_dir):
+        self.path = os.path.join(images_dir, "manifest.jsonl")
+        self.lock = threading.Lock()
+        self.lines = JsonLines(self.path)
+        self.entries = {entry["name"]: entry for entry in self.lines.read("name", "size")}
+
+    def is_complete(self, image_name, path):
+        """Return True if path holds the verified download recorded for image_name."""
+        with self.lock:
+            entry = self.entries.get(image_name)
+
+        if not entry or not os.path.exists(path):
+            return False
+        if os.path.getsize(path) != entry["size"]:
+            return False
+        return image_is_complete(path)
+
+    def sha256(self, image_name):
+        """Return the recorded SHA-256 of an image, or None."""
+        with self.lock:
+            entry = self.entries.get(image_name)
+        return entry.get("sha256") if entry else None
+
+    def record(self, image_name, path, sha256):
+        """Record a verified image file."""
+        entry = {"name": image_name, "size": os.path.getsize(path), "sha256": sha256}
+        with self.lock:
+            self.entries[image_name] = entry
+            self.lines.append(entry)
@@ -0,0 +1,43 @@
+import os
+import json
+
+class JsonLines:
+    """
+    Append-only file of JSON objects, one per line.
+
+    A crash mid-append can leave a partial last line. Reading skips it, and
+    the next append starts on a new line so the new entry is not glued to it.
+    Callers do their own locking.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.needs_newline = False
+
+    def read(self, *keys):
+        """Return the entries in the file, skipping unreadable lines and entries missing any of keys."""
+        entries = []
+        if not os.path.exists(self.path):
+            return entries
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                self.needs_newline = not line.endswith("\n")
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and all(key in entry for key in keys):
+                    entries.append(entry)
+        return entries
+
+    def append(self, entry, sync=False):
+        """Append one entry; with sync=True it is on disk before returning."""
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if self.needs_newline:
+                f.write("\n")
+                self.needs_newline = False
+            f.write(json.dumps(entry) + "\n")
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
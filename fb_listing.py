@@ -0,0 +1,105 @@
+import csv
+import json
+from fb_listingImages import parse_image_entries, resolve_image_paths, format_images_column
+
+# Columns of the daily listings CSV, in order
+CSV_FIELDS = ["id", "title", "price", "description", "images", "location"]
+TITLE_PREFIX = "Rent a "
+
+def parse_price(value):
+    """
+    Return a price as whole dollars, accepting ints, "15", "15.0" or "$15".
+    Returns None for a missing or unparsable price; 0 is a valid (free) price.
+    """
+    if isinstance(value, int):
+        return value
+    try:
+        return int(float(str(value).replace("$", "").replace(",", "").strip()))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+class Listing:
+    """
+    One listing as it moves between the scripts.
+
+    Fields are parsed once when a record is built: price is whole dollars
+    (None if missing or unparsable), images is the list of image entries
+    ({path, size, sha256}, plus the downloaded "original" of a resized
+    image) and image_paths their absolute paths on this machine. csv_file and file_date record where a
+    record read from disk came from.
+    """
+
+    __slots__ = ("id", "title", "price", "description", "location", "category",
+                 "images", "image_paths", "file_date", "csv_file")
+
+    def __init__(self, id=None, title="", price=0, description="", location="", category=None,
+                 images=None, file_date=None, csv_file=None):
+        self.id = str(id) if id not in (None, "") else None
+        self.title = title or ""
+        self.price = parse_price(price)
+        self.description = description or ""
+        self.location = location or ""
+        self.category = category or None
+        self.images = parse_image_entries(images or [])
+        self.image_paths = resolve_image_paths(self.images)
+        self.file_date = file_date
+        self.csv_file = csv_file
+
+    def __repr__(self):
+        return f"Listing(id={self.id!r}, title={self.title!r}, price={self.price!r}, images={len(self.images)})"
+
+    @property
+    def name(self):
+        """The title without the "Rent a " prefix."""
+        if self.title.lower().startswith(TITLE_PREFIX.lower()):
+            return self.title[len(TITLE_PREFIX):]
+        return self.title
+
+    def set_images(self, entries):
+        """Replace the image entries and their resolved paths."""
+        self.images = parse_image_entries(entries)
+        self.image_paths = resolve_image_paths(self.images)
+
+    @classmethod
+    def from_csv_row(cls, row, file_date=None, csv_file=None):
+        """Build a record from a csv.DictReader row; a file_date column overrides file_date."""
+        return cls(
+            id=row.get("id"),
+            title=row.get("title"),
+            price=row.get("price"),
+            description=row.get("description"),
+            location=row.get("location"),
+            category=row.get("category"),
+            images=row.get("images"),
+            file_date=row.get("file_date") or file_date,
+            csv_file=csv_file,
+        )
+
+    def to_csv_values(self):
+        """Return the values for one CSV_FIELDS row."""
+        return [self.id or "", self.title, self.price, self.description,
+                format_images_column(self.images), self.location]
+
+    def to_csv_dict(self):
+        """Return the CSV_FIELDS columns plus file_date as a dict, for csv.DictWriter."""
+        row = dict(zip(CSV_FIELDS, self.to_csv_values()))
+        row["file_date"] = self.file_date or ""
+        return row
+
+    def to_json(self):
+        """Return the record as a JSON string."""
+        return json.dumps({
+            "id": self.id, "title": self.title, "price": self.price, "description": self.description,
+            "location": self.location, "category": self.category, "images": self.images,
+            "file_date": self.file_date, "csv_file": self.csv_file,
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text):
+        """Build a record from to_json output."""
+        return cls(**json.loads(text))
+
+def read_listings_csv(csv_path, file_date=None):
+    """Read a listings CSV into Listing records."""
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        return [Listing.from_csv_row(row, file_date=file_date, csv_file=csv_path) for row in csv.DictReader(f)]
@@ -0,0 +1,84 @@
+import os
+import re
+import ast
+import json
+from fb_imageStore import file_sha256
+
+# Image paths in the CSV are relative to the folder holding the data_YYYY-MM-DD directories
+DATA_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Finds the data_YYYY-MM-DD part of an absolute path written on another machine
+DATA_DIR_PATTERN = re.compile(r"(?:^|[\\/])(data_\d{4}-\d{2}-\d{2}[\\/].+)$")
+
+def relative_image_path(path, data_root=DATA_ROOT):
+    """Return an image path relative to the data root, rebasing paths from other machines."""
+    match = DATA_DIR_PATTERN.search(path)
+    if match:
+        return match.group(1).replace("\\", "/")
+    if os.path.isabs(path):
+        return os.path.relpath(path, data_root).replace(os.sep, "/")
+    return path.replace("\\", "/")
+
+def build_image_entries(paths, data_root=DATA_ROOT, hashes=None, originals=None):
+    """
+    Describe a listing's images for the CSV images column.
+    Each entry holds the path relative to the data root, the file size and its SHA-256.
+    hashes maps paths to SHA-256s computed earlier; only the other files are read and hashed.
+    originals maps resized paths to the downloaded files they were made from, kept as "original".
+    """
+    hashes = hashes or {}
+    originals = originals or {}
+    entries = []
+    for path in paths:
+        if not path:
+            continue
+        entry = {"path": relative_image_path(path, data_root)}
+        if originals.get(path, path) != path:
+            entry["original"] = relative_image_path(originals[path], data_root)
+        try:
+            entry["size"] = os.path.getsize(path)
+            entry["sha256"] = hashes.get(path) or file_sha256(path)
+        except OSError as e:
+            print(f"[⚠️] Could not read image {path}: {e}")
+        entries.append(entry)
+    return entries
+
+def format_images_column(entries):
+    """Serialize image entries for the CSV images column."""
+    return json.dumps(entries, separators=(",", ":"))
+
+def parse_image_entries(value):
+    """
+    Parse a CSV images column into a list of entries ({"path": ...} at least).
+    Reads the JSON written by create_csv as well as the older str(list) of absolute paths.
+    """
+    if isinstance(value, list):
+        items = value
+    else:
+        value = (value or "").strip().strip("\"'").strip()
+        if not value:
+            return []
+        try:
+            items = json.loads(value)
+        except ValueError:
+            try:
+                items = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                # Damaged legacy value, e.g. a missing closing quote or bracket
+                items = [part.strip().strip("\"'[]").strip() for part in value.split(",")]
+
+    if isinstance(items, (str, dict)):
+        items = [items]
+
+    entries = []
+    for item in items:
+        if isinstance(item, dict) and item.get("path"):
+            entries.append(item)
+        elif isinstance(item, str) and item.strip():
+            entries.append({"path": item.strip()})
+    return entries
+
+def resolve_image_paths(value, data_root=DATA_ROOT):
+    """Return the absolute paths of the images in a CSV images column, in order."""
+    return [os.path.join(data_root, relative_image_path(entry["path"], data_root))
+            for entry in parse_image_entries(value)]
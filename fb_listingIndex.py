@@ -0,0 +1,340 @@
+import os
+import re
+import glob
+import sqlite3
+import threading
+from collections import Counter
+from fb_listing import Listing, read_listings_csv
+
+# Every data_YYYY-MM-DD directory lives next to the scripts
+DATA_ROOT = os.path.dirname(os.path.abspath(__file__))
+INDEX_PATH = os.path.join(DATA_ROOT, "listing_index.db")
+
+# Title matching settings
+MATCH_THRESHOLD = 0.6  # Lowest similarity accepted as a match
+TRUNCATED_SCORE = 0.95  # Score when a truncated title is a prefix of the other
+ELLIPSES = ("...", "…")
+
+# Bump when the tables or the stored record format change; the index is then rebuilt
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rows (
+    rowid INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    file_date TEXT,
+    line INTEGER NOT NULL,
+    id TEXT,
+    title TEXT,
+    norm_title TEXT,
+    location TEXT,
+    row_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rows_path ON rows (path);
+CREATE INDEX IF NOT EXISTS rows_id ON rows (id);
+CREATE INDEX IF NOT EXISTS rows_norm_title ON rows (norm_title);
+CREATE INDEX IF NOT EXISTS rows_file_date ON rows (file_date);
+"""
+
+def normalize_title(title):
+    """Lowercase a title, drop the "Rent a " prefix the fetch step adds and collapse whitespace."""
+    title = " ".join((title or "").lower().split())
+    if title.startswith("rent a "):
+        title = title[7:]
+    return title.strip()
+
+def csv_file_date(csv_path):
+    """
+    Return the YYYY-MM-DD date in a listings_YYYY-MM-DD.csv file name, or None.
+    Rows of the compacted archive carry their original date in a file_date column instead.
+    """
+    match = re.search(r"listings_(\d{4}-\d{2}-\d{2})\.csv$", csv_path)
+    return match.group(1) if match else None
+
+def titles_match(title, row_title):
+    """The match rule the CSV scans used: equal, or either title contains the other."""
+    return bool(row_title) and (title == row_title or title in row_title or row_title in title)
+
+class ListingIndex:
+    """
+    SQLite index of every row in the data_*/listings_*.csv files.
+
+    Rows are keyed by normalized title, id, file date and location and keep
+    the full Listing record as JSON. The files table records each CSV's mtime and
+    size, so refresh() only re-reads files that changed on disk and drops
+    files that were deleted. Title searches use an FTS5 table when SQLite
+    has it and fall back to a plain scan of the indexed titles otherwise.
+    """
+
+    def __init__(self, path=INDEX_PATH, data_root=DATA_ROOT):
+        self.path = path
+        self.data_root = data_root
+        self.lock = threading.Lock()
+        self.version = 0  # Bumped whenever indexed rows change
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS rows; DROP TABLE IF EXISTS rows_fts;")
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.executescript(SCHEMA)
+
+        try:
+            self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS rows_fts USING fts5(norm_title)")
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            print("[⚠️] SQLite has no FTS5 support; title searches will scan the index")
+            self.has_fts = False
+        self.conn.commit()
+
+    def csv_files(self):
+        """Return every listings CSV under the data directories."""
+        return glob.glob(os.path.join(self.data_root, "data_*", "listings_*.csv"))
+
+    def refresh(self):
+        """Re-index CSV files that are new or changed since they were indexed. Returns the number re-indexed."""
+        on_disk = {}
+        for csv_path in self.csv_files():
+            try:
+                stat = os.stat(csv_path)
+                on_disk[csv_path] = (stat.st_mtime, stat.st_size)
+            except OSError:
+                continue
+
+        with self.lock:
+            indexed = {row["path"]: (row["mtime"], row["size"]) for row in self.conn.execute("SELECT * FROM files")}
+
+        for csv_path in indexed.keys() - on_disk.keys():
+            with self.lock:
+                self.remove_rows(csv_path)
+                self.conn.execute("DELETE FROM files WHERE path = ?", (csv_path,))
+                self.conn.commit()
+                self.version += 1
+
+        changed = [csv_path for csv_path, signature in on_disk.items() if indexed.get(csv_path) != signature]
+        for csv_path in changed:
+            self.index_file(csv_path)
+        return len(changed)
+
+    def remove_rows(self, csv_path):
+        """Delete the indexed rows of one file. Caller holds the lock."""
+        if self.has_fts:
+            self.conn.execute("DELETE FROM rows_fts WHERE rowid IN (SELECT rowid FROM rows WHERE path = ?)", (csv_path,))
+        self.conn.execute("DELETE FROM rows WHERE path = ?", (csv_path,))
+
+    def index_file(self, csv_path):
+        """(Re-)index every row of one CSV file."""
+        csv_path = os.path.abspath(csv_path)
+        try:
+            stat = os.stat(csv_path)
+            listings = read_listings_csv(csv_path, file_date=csv_file_date(csv_path))
+        except Exception as e:
+            print(f"[⚠️] Could not index {csv_path}: {e}")
+            return
+
+        with self.lock:
+            self.remove_rows(csv_path)
+            for line, listing in enumerate(listings):
+                norm_title = normalize_title(listing.title)
+                cursor = self.conn.execute(
+                    "INSERT INTO rows (path, file_date, line, id, title, norm_title, location, row_json) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (csv_path, listing.file_date, line, listing.id, listing.title, norm_title,
+                     listing.location, listing.to_json())
+                )
+                if self.has_fts:
+                    self.conn.execute("INSERT INTO rows_fts (rowid, norm_title) VALUES (?, ?)",
+                                      (cursor.lastrowid, norm_title))
+            self.conn.execute("INSERT OR REPLACE INTO files (path, mtime, size) VALUES (?, ?, ?)",
+                              (csv_path, stat.st_mtime, stat.st_size))
+            self.conn.commit()
+            self.version += 1
+
+    def candidates(self, norm_title, file_date=None):
+        """Return indexed rows that could match a normalized title, newest file first."""
+        where = ""
+        params = []
+        if file_date:
+            where = "AND rows.file_date = ? "
+            params.append(file_date)
+        order = "ORDER BY rows.file_date DESC, rows.line ASC"
+
+        words = re.findall(r"\w+", norm_title)
+        with self.lock:
+            if self.has_fts and words:
+                # Any shared word; substring matching is checked by the caller
+                match = " OR ".join('"' + word + '"' for word in words)
+                return self.conn.execute(
+                    "SELECT rows.* FROM rows JOIN rows_fts ON rows_fts.rowid = rows.rowid "
+                    f"WHERE rows_fts MATCH ? {where}{order}", [match] + params
+                ).fetchall()
+            return self.conn.execute(
+                f"SELECT * FROM rows WHERE (instr(norm_title, ?) > 0 OR instr(?, norm_title) > 0) {where}{order}",
+                [norm_title, norm_title] + params
+            ).fetchall()
+
+    def find(self, title, file_date=None, require_id=False):
+        """
+        Return the Listing of the newest CSV row whose title matches, or None.
+        file_date limits the search to listings_<file_date>.csv; require_id skips rows without an id.
+        """
+        norm_title = normalize_title(title)
+        if not norm_title:
+            return None
+
+        self.refresh()
+        for row in self.candidates(norm_title, file_date):
+            if require_id and not row["id"]:
+                continue
+            if titles_match(norm_title, row["norm_title"]):
+                return Listing.from_json(row["row_json"])
+        return None
+
+    def find_by_id(self, listing_id):
+        """Return the Listing of the newest CSV row with the given listing id, or None."""
+        self.refresh()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT * FROM rows WHERE id = ? ORDER BY file_date DESC LIMIT 1", (str(listing_id),)
+            ).fetchone()
+        if not row:
+            return None
+        return Listing.from_json(row["row_json"])
+
+    def ids(self):
+        """Return the set of listing ids in every indexed CSV."""
+        self.refresh()
+        with self.lock:
+            return {row["id"] for row in self.conn.execute("SELECT DISTINCT id FROM rows WHERE id IS NOT NULL")}
+
+    def entries(self, require_id=False):
+        """Return (normalized title, Listing) for every indexed row, newest file first."""
+        query = "SELECT * FROM rows "
+        if require_id:
+            query += "WHERE id IS NOT NULL "
+        query += "ORDER BY file_date DESC, line ASC"
+        with self.lock:
+            rows = self.conn.execute(query).fetchall()
+
+        return [(row["norm_title"], Listing.from_json(row["row_json"])) for row in rows]
+
+    def close(self):
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
+
+def strip_ellipsis(title):
+    """Return (title without a trailing ellipsis, whether it had one)."""
+    for ellipsis in ELLIPSES:
+        if title.endswith(ellipsis):
+            return title[:-len(ellipsis)].rstrip(), True
+    return title, False
+
+def trigrams(title):
+    """Return the set of character trigrams of a title, padded so word starts count."""
+    padded = f"  {title} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TitleMatcher:
+    """
+    In-memory trigram index over listing titles.
+
+    An inverted index maps each trigram to the titles containing it, so a
+    lookup only scores titles sharing a trigram with the query. Titles are
+    ranked by Dice similarity of their trigram sets; an exact match scores 1.0
+    and a title cut off with an ellipsis (by create_csv at 95 characters or by
+    Facebook) scores TRUNCATED_SCORE when it is a prefix of the other title.
+    Ties go to the newest listing.
+    """
+
+    def __init__(self, entries, threshold=MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.titles = []
+        self.sizes = []
+        self.truncated = []
+        self.listings = []
+        self.postings = {}
+
+        for norm_title, listing in entries:
+            title, truncated = strip_ellipsis(norm_title)
+            if not title:
+                continue
+            position = len(self.titles)
+            grams = trigrams(title)
+            self.titles.append(title)
+            self.sizes.append(len(grams))
+            self.truncated.append(truncated)
+            self.listings.append(listing)
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(position)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def score(self, query, query_grams, query_truncated, position, shared):
+        """Return the similarity between a query and one indexed title sharing `shared` trigrams with it."""
+        title = self.titles[position]
+        if query == title and query_truncated == self.truncated[position]:
+            return 1.0
+        if query_truncated and title.startswith(query):
+            return TRUNCATED_SCORE
+        if self.truncated[position] and query.startswith(title):
+            return TRUNCATED_SCORE
+        return 2 * shared / (len(query_grams) + self.sizes[position])
+
+    def match(self, title):
+        """
+        Return (Listing, score) for the best-matching title, or (None, best score)
+        if nothing reaches the threshold.
+        """
+        query, query_truncated = strip_ellipsis(normalize_title(title))
+        if not query:
+            return None, 0.0
+
+        query_grams = trigrams(query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+
+        best_position = None
+        best_score = 0.0
+        # Positions are newest first, so on equal scores the earlier one wins
+        for position in sorted(shared):
+            score = self.score(query, query_grams, query_truncated, position, shared[position])
+            if score > best_score:
+                best_position, best_score = position, score
+
+        if best_position is None or best_score < self.threshold:
+            return None, best_score
+        return self.listings[best_position], best_score
+
+shared_index = None
+shared_index_lock = threading.Lock()
+shared_matcher = None
+shared_matcher_version = None
+
+def get_index():
+    """Return the process-wide ListingIndex, creating it on first use."""
+    global shared_index
+    with shared_index_lock:
+        if shared_index is None:
+            shared_index = ListingIndex()
+        return shared_index
+
+def get_matcher():
+    """
+    Return the process-wide TitleMatcher over listings that have an id.
+    It is built on first use and rebuilt only when the CSV index has changed.
+    """
+    global shared_matcher, shared_matcher_version
+    index = get_index()
+    index.refresh()
+    with shared_index_lock:
+        if shared_matcher is None or shared_matcher_version != index.version:
+            shared_matcher_version = index.version
+            shared_matcher = TitleMatcher(index.entries(require_id=True))
+        return shared_matcher
@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import threading
+from fb_waits import wait_stats
+
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locator_stats.json")
+
+# Registry settings
+HISTORY_DECAY = 0.9  # Weight kept by older results on each new attempt, so a Facebook UI change wins out quickly
+MIN_SUCCESS_RATE = 0.5  # Strategies below this are tried after the ones that have never been tried
+
+class LocatorRegistry:
+    """
+    Success rate and latency of each locator strategy per field, persisted as JSON between runs.
+
+    A field is something a helper looks for, like "input:Title" or
+    "button:Next". Its strategies are tried fastest-working first, so
+    expensive fallbacks only run when the usual strategy misses. Strategies
+    that click something count as working only once a check of the page
+    passes; without one they keep their fixed order.
+    """
+
+    def __init__(self, path=REGISTRY_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.dirty = False
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.stats = json.load(f)
+            except Exception as e:
+                print(f"[⚠️] Could not read locator stats, starting fresh: {e}")
+
+    def record(self, field, strategy, seconds, found):
+        """Record one attempt of a strategy; older attempts weigh less each time."""
+        with self.lock:
+            entry = self.stats.setdefault(field, {}).setdefault(
+                strategy, {"hits": 0.0, "misses": 0.0, "hit_seconds": 0.0})
+            for key in entry:
+                entry[key] *= HISTORY_DECAY
+            if found:
+                entry["hits"] += 1
+                entry["hit_seconds"] += seconds
+            else:
+                entry["misses"] += 1
+            self.dirty = True
+
+    def order(self, field, names):
+        """
+        Return strategy names in the order to try them: working ones by average
+        latency, then untried ones, then failing ones, each group in the given order.
+        """
+        with self.lock:
+            stats = self.stats.get(field, {})
+
+            def rank(name):
+                entry = stats.get(name)
+                if entry is None or entry["hits"] + entry["misses"] == 0:
+                    return (1, 0.0)
+                if entry["hits"] / (entry["hits"] + entry["misses"]) < MIN_SUCCESS_RATE:
+                    return (2, 0.0)
+                return (0, entry["hit_seconds"] / entry["hits"])
+
+            return sorted(names, key=rank)
+
+    def locate(self, driver, field, strategies, verify=None, adaptive=True, debug=False):
+        """
+        Try (name, function) strategies in order() until one returns something truthy, and return it.
+        Each function takes the driver; exceptions count as misses. Returns None if all miss.
+        verify(driver), if given, must also pass for a result to count; it is not timed.
+        With adaptive=False the strategies run in the given order and stats are only recorded.
+        """
+        functions = dict(strategies)
+        names = [name for name, _ in strategies]
+        for name in self.order(field, names) if adaptive else names:
+            start = time.monotonic()
+            # Waits on the page (e.g. a smooth scroll settling) measure the page, not the strategy
+            waited = wait_stats.total()
+            try:
+                result = functions[name](driver)
+            except Exception as e:
+                if debug:
+                    print(f"[⚠️] {field}: strategy {name} raised {e}")
+                result = None
+            seconds = max(0.0, time.monotonic() - start - (wait_stats.total() - waited))
+            if result and verify and not verify(driver):
+                if debug:
+                    print(f"[⚠️] {field}: strategy {name} acted but the page did not change as expected")
+                result = None
+            self.record(field, name, seconds, bool(result))
+            if result:
+                if debug:
+                    print(f"[🧭] {field}: found with strategy {name}")
+                return result
+        if debug:
+            print(f"[🧭] {field}: no strategy found it")
+        return None
+
+    def save(self):
+        """Persist the stats if they changed."""
+        with self.lock:
+            if not self.dirty or not self.path:
+                return
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.stats, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+shared_registry = None
+shared_registry_lock = threading.Lock()
+
+def get_registry():
+    """Return the locator registry shared by this process, loading it on first use."""
+    global shared_registry
+    with shared_registry_lock:
+        if shared_registry is None:
+            shared_registry = LocatorRegistry()
+        return shared_registry
@@ -0,0 +1,91 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lookup_cache.json")
+
+# Cache settings
+MAX_ENTRIES = 2000  # Least recently used entries are evicted past this
+POSITIVE_TTL = 7 * 24 * 3600  # Seconds a found listing ID is trusted
+NEGATIVE_TTL = 3600  # Seconds a "not found" is trusted; new listings may appear
+
+class LookupCache:
+    """
+    LRU cache with expiry for listing lookups, persisted as JSON between runs.
+
+    Found values and "not found" results (stored as None) are both cached,
+    with separate TTLs. Expiry uses wall-clock time so it holds across runs.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES, ttl=POSITIVE_TTL, negative_ttl=NEGATIVE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.dirty = False
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    now = time.time()
+                    for key, entry in json.load(f):
+                        if entry["expires"] > now:
+                            self.entries[key] = entry
+            except Exception as e:
+                print(f"[⚠️] Could not read lookup cache, starting fresh: {e}")
+
+    def get(self, key):
+        """Return (True, value) on a hit, where value None means "not found", or (False, None) on a miss."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry["expires"] <= time.time():
+                del self.entries[key]
+                self.dirty = True
+                entry = None
+
+            if not entry:
+                self.misses += 1
+                return False, None
+
+            self.entries.move_to_end(key)
+            if entry["value"] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, entry["value"]
+
+    def put(self, key, value):
+        """Cache a value, or None for "not found"."""
+        ttl = self.negative_ttl if value is None else self.ttl
+        with self.lock:
+            self.entries[key] = {"value": value, "expires": time.time() + ttl}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.dirty = True
+
+    def save(self):
+        """Persist the cache in LRU order if it changed."""
+        with self.lock:
+            if not self.dirty or not self.path:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(list(self.entries.items()), f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+    def summary(self):
+        """Return a one-line summary of the cache counters."""
+        with self.lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            rate = (self.hits + self.negative_hits) / lookups * 100 if lookups else 0.0
+            return (f"[🗃️] Lookup cache: {self.hits} hits, {self.negative_hits} negative hits, "
+                    f"{self.misses} misses ({rate:.0f}% hit rate), {len(self.entries)} entries")
@@ -0,0 +1,133 @@
+import time
+import queue
+import threading
+
+# Marks the end of a stage's output
+SENTINEL = object()
+
+class StageStats:
+    """Counters for one pipeline stage: items handled, time per item and depth of its output queue."""
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.max_seconds = 0.0
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.max_depth = 0
+
+    def record(self, seconds):
+        """Record the time spent on one item."""
+        with self.lock:
+            self.items += 1
+            self.busy_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    def sample_depth(self, q):
+        """Record the current depth of the queue this stage feeds."""
+        depth = q.qsize()
+        with self.lock:
+            self.depth_samples += 1
+            self.depth_total += depth
+            self.max_depth = max(self.max_depth, depth)
+
+    def as_dict(self):
+        """Return the counters as a plain dict."""
+        with self.lock:
+            return {
+                "stage": self.name,
+                "items": self.items,
+                "avg_ms": self.busy_seconds / self.items * 1000 if self.items else 0.0,
+                "max_ms": self.max_seconds * 1000,
+                "avg_queue_depth": self.depth_total / self.depth_samples if self.depth_samples else 0.0,
+                "max_queue_depth": self.max_depth,
+            }
+
+    def summary(self):
+        """Return a one-line summary of the stage."""
+        stats = self.as_dict()
+        return (f"[📈] Stage {stats['stage']}: {stats['items']} items, "
+                f"avg {stats['avg_ms']:.0f} ms / max {stats['max_ms']:.0f} ms per item, "
+                f"queue depth avg {stats['avg_queue_depth']:.1f} / max {stats['max_queue_depth']}")
+
+def run_pipeline(source, work, consume, workers=4, queue_size=16, names=("fetch", "download", "write")):
+    """
+    Run source → work → consume as overlapping stages connected by bounded queues.
+
+    Args:
+        source: Iterable of items, drained on its own thread
+        work: Function applied to each item by `workers` threads
+        consume: Function given an iterator of (seq, result) pairs in completion order;
+                 runs on the calling thread. seq is the item's position in source and
+                 result is None if work raised.
+        workers: Number of threads running `work`
+        queue_size: Capacity of each queue; a full queue blocks the stage feeding it
+        names: Names of the three stages in the stats
+
+    Returns:
+        (return value of consume, [StageStats for each stage])
+    """
+    source_stats, work_stats, consume_stats = (StageStats(name) for name in names)
+    work_queue = queue.Queue(maxsize=queue_size)
+    result_queue = queue.Queue(maxsize=queue_size)
+
+    def produce():
+        try:
+            started = time.perf_counter()
+            for seq, item in enumerate(source):
+                source_stats.record(time.perf_counter() - started)
+                work_queue.put((seq, item))
+                source_stats.sample_depth(work_queue)
+                started = time.perf_counter()
+        except Exception as e:
+            print(f"[❌] Error in {source_stats.name} stage: {e}")
+        finally:
+            for _ in range(workers):
+                work_queue.put(SENTINEL)
+
+    def process():
+        try:
+            while True:
+                entry = work_queue.get()
+                if entry is SENTINEL:
+                    break
+
+                seq, item = entry
+                started = time.perf_counter()
+                try:
+                    result = work(item)
+                except Exception as e:
+                    print(f"[❌] Error in {work_stats.name} stage: {e}")
+                    result = None
+                work_stats.record(time.perf_counter() - started)
+
+                result_queue.put((seq, result))
+                work_stats.sample_depth(result_queue)
+        finally:
+            result_queue.put(SENTINEL)
+
+    def results():
+        finished = 0
+        while finished < workers:
+            entry = result_queue.get()
+            if entry is SENTINEL:
+                finished += 1
+                continue
+
+            started = time.perf_counter()
+            yield entry
+            consume_stats.record(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=produce, name=source_stats.name, daemon=True)]
+    threads += [threading.Thread(target=process, name=f"{work_stats.name}-{i}", daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    outcome = consume(results())
+
+    for thread in threads:
+        thread.join()
+
+    return outcome, [source_stats, work_stats, consume_stats]
@@ -1,18 +1,37 @@
 from datetime import datetime
-import os, csv, time
+import os, time, glob
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 import sys
+from fb_listingImages import resolve_image_paths
+from fb_listing import read_listings_csv
+from fb_preflight import preflight
+from fb_postingJournal import PostingJournal
+from fb_postWorkers import post_listings_parallel
+from fb_formFill import fill_form, form_field
+from fb_locatorRegistry import get_registry
+from fb_waits import (wait_for, wait_stats, element_present, text_visible, element_in_view,
+                      element_focused, element_gone, value_equals, dropdown_open, count_thumbnails,
+                      thumbnails_rendered, navigation_finished, alert_closed, enclosing_dialog,
+                      NAVIGATION_TIMEOUT, UPLOAD_TIMEOUT, DIALOG_TIMEOUT)
 
 # Global settings
 DEBUG_MODE = False  # Global debug flag, will be set from main()
 AUTO_PUBLISH = False  # Global auto-publish flag, will be set from main()
+INTERACTIVE = True  # Whether prompts may wait for input(); off in parallel posting workers
 
-def get_driver():
-    """Set up and return a Chrome WebDriver with appropriate options."""
+def list_profiles():
+    """Return the Chrome profile directories (~/.fb_<name>) created by get_driver."""
+    return sorted(p for p in glob.glob(os.path.join(os.path.expanduser("~"), ".fb_*")) if os.path.isdir(p))
+
+def get_driver(profile=None):
+    """
+    Set up and return a Chrome WebDriver with appropriate options.
+    profile is a profile directory or name to use without asking; by default the user picks one.
+    """
     from selenium.webdriver.chrome.service import Service
     from selenium.webdriver.chrome.options import Options
     import os
@@ -39,7 +58,11 @@ def get_driver():
     # Determine which profile to use
     selected_profile = None
     
-    if existing_profiles:
+    if profile:
+        selected_profile = profile if os.path.isdir(profile) else os.path.join(home_dir, f".fb_{profile}")
+        os.makedirs(selected_profile, exist_ok=True)
+        print(f"[✅] Using profile: {selected_profile}")
+    elif existing_profiles:
         if len(existing_profiles) == 1:
             # Single profile found
             selected_profile = existing_profiles[0]
@@ -166,57 +189,73 @@ def get_driver():
 
 
 def find_element_by_text(driver, text, element_type=None, debug=False):
-    """Find an element by text and return the related input field."""
-    # wait = WebDriverWait(driver, 10)
-    
+    """
+    Find an element by text and return the related input field.
+    The locator registry tries the strategy that worked fastest for this label first.
+    """
     if debug:
         print(f"[🔍] Looking for element with text: '{text}'")
-    
-    try:
-        # Method 3: Find any element containing the text
-        elements = driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]")
-        
-        if debug:
-            print(f"[💡] Found {len(elements)} elements containing '{text}'")
-        
-        for i, element in enumerate(elements):
+
+    labels = []
+
+    def label_elements():
+        # Looked up once, and only by the strategies that need them
+        if not labels:
+            labels.extend(driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]"))
             if debug:
-                print(f"[🔍] Checking element {i+1}/{len(elements)}")
-            
-            # First approach: Check following input elements
-            try:
-                # If element_type is specified, look for that type; otherwise use a generic approach
-                xpath = f"./following::{element_type}" if element_type else "./following::input | ./following::textarea | ./following::select"
-                result = element.find_element(By.XPATH, xpath)
-                if debug:
-                    print(f"[✅] Found element as following sibling")
-                return result
-            except:
-                # Second approach: Check parent's children
-                try:
-                    parent = element.find_element(By.XPATH, "./ancestor::div[position() <= 3]")
-                    xpath = f".//{element_type}" if element_type else ".//input | .//textarea | .//select"
-                    result = parent.find_element(By.XPATH, xpath)
-                    if debug:
-                        print(f"[✅] Found element as child of ancestor")
-                    return result
-                except:
-                    if debug:
-                        print(f"[❌] Couldn't find related input for this element")
-                    continue
-        
-        # If we get here, no element was found
-        if debug:
-            print(f"[❌] No suitable element found for '{text}'")
+                print(f"[💡] Found {len(labels)} elements containing '{text}'")
+        return labels
+
+    def following_input(driver):
+        # If element_type is specified, look for that type; otherwise use a generic approach
+        xpath = f"./following::{element_type}" if element_type else "./following::input | ./following::textarea | ./following::select"
+        for element in label_elements():
+            found = element.find_elements(By.XPATH, xpath)
+            if found:
+                return found[0]
         return None
-    
-    except Exception as e:
-        if debug:
-            print(f"[❌] Error finding element with text '{text}': {e}")
+
+    def ancestor_input(driver):
+        # Check the children of the label's nearby ancestors
+        xpath = f".//{element_type}" if element_type else ".//input | .//textarea | .//select"
+        for element in label_elements():
+            for parent in element.find_elements(By.XPATH, "./ancestor::div[position() <= 3]"):
+                found = parent.find_elements(By.XPATH, xpath)
+                if found:
+                    return found[0]
         return None
 
+    def scan_input(driver):
+        # One script scanning the page for a <label> wrapping both the text and an input
+        return driver.execute_script("""
+            var text = arguments[0], selector = arguments[1];
+            var labels = document.querySelectorAll('label');
+            for (var i = 0; i < labels.length; i++) {
+                if (labels[i].textContent.includes(text)) {
+                    var input = labels[i].querySelector(selector);
+                    if (input) return input;
+                }
+            }
+            return null;
+        """, text, element_type or "input, textarea, select")
+
+    result = get_registry().locate(driver, f"input:{element_type or 'any'}:{text}", [
+        ("following", following_input),
+        ("ancestor", ancestor_input),
+        ("label_scan", scan_input),
+    ], debug=debug)
+
+    if not result and debug:
+        print(f"[❌] No suitable element found for '{text}'")
+    return result
+
 def upload_images(driver, image_paths, debug=False):
-    """Upload multiple images to the listing."""
+    """
+    Upload all images of a listing. image_paths are absolute paths from resolve_image_paths.
+    Every path goes to the multiple-file input in one send_keys, then the thumbnails are
+    awaited once; pages without such an input get one image at a time. Images the batch
+    did not take are uploaded one at a time, without sending the accepted ones again.
+    """
     if not image_paths:
         print("[⚠️] No image paths provided")
         return False
@@ -224,27 +263,57 @@ def upload_images(driver, image_paths, debug=False):
     # Convert single image path to list for consistent handling
     if isinstance(image_paths, str):
         image_paths = [image_paths]
-    
+
+    baseline = count_thumbnails(driver)
+    file_input = wait_for(driver, element_present((By.XPATH, "//input[@type='file']")), "file input", debug=debug)
+    if file_input is None or file_input.get_attribute("multiple") is None:
+        print("[ℹ️] No multiple-file input, uploading images one at a time")
+        return upload_images_one_by_one(driver, image_paths, debug=debug)
+
+    try:
+        # Chrome takes several files in one send_keys when the paths are newline-separated
+        file_input.send_keys("\n".join(image_paths))
+    except Exception as e:
+        print(f"[⚠️] Batch upload failed, uploading images one at a time: {e}")
+        return upload_images_one_by_one(driver, image_paths, debug=debug)
+
+    wait_for(driver, thumbnails_rendered(baseline + len(image_paths)), f"{len(image_paths)} image thumbnails",
+             timeout=UPLOAD_TIMEOUT, debug=debug)
+    rendered = count_thumbnails(driver) - baseline
+    print(f"[📊] Uploaded {rendered}/{len(image_paths)} images in one batch")
+    if rendered >= len(image_paths):
+        return True
+
+    # Files the input accepted may still be processing; sending them again would post duplicate photos
+    try:
+        accepted = driver.execute_script("return arguments[0].files ? arguments[0].files.length : 0;", file_input)
+    except Exception:
+        accepted = len(image_paths)
+    taken = max(accepted or 0, rendered)
+    if taken >= len(image_paths):
+        print(f"[⚠️] All {len(image_paths)} images were accepted but only {rendered} thumbnails rendered")
+        return False
+    print(f"[⚠️] The batch took {taken}/{len(image_paths)} images, uploading the rest one at a time")
+    return upload_images_one_by_one(driver, image_paths[taken:], debug=debug)
+
+def upload_images_one_by_one(driver, image_paths, debug=False):
+    """Upload images one at a time through the Add Photo buttons, for pages without a multiple-file input."""
     uploaded_count = 0
+    # Previews already on the page (e.g. from a retried attempt) don't count as this upload's
+    baseline = count_thumbnails(driver)
+    file_input = (By.XPATH, "//input[@type='file']")
     
     for i, image in enumerate(image_paths):
-        # for image in images:
-        if isinstance(image, str):
-            # More thorough cleaning for quotes and spaces
-            image = image.strip().strip("'\"").strip()
+        if debug:
             print(f"[🔍] Processing image: {image}")
         
-        if not os.path.exists(image):
-            print(f"[⚠️] Image file does not exist: {image}")
-            continue
-        
         try:
             if i == 0:  # For the first image
                 # Direct approach - look for file inputs immediately
                 file_inputs = driver.find_elements(By.XPATH, "//input[@type='file']")
                 if (file_inputs and len(file_inputs) > 0):
                     file_inputs[0].send_keys(image)
-                    time.sleep(0.25)  # Allow upload to start
+                    wait_for(driver, thumbnails_rendered(baseline + 1), "primary image thumbnail", timeout=UPLOAD_TIMEOUT, debug=debug)
                     uploaded_count += 1
                     print(f"[📸] Uploaded primary image: {os.path.basename(image)}")
                 else:
@@ -252,13 +321,12 @@ def upload_images(driver, image_paths, debug=False):
                     photo_buttons = driver.find_elements(By.XPATH, "//span[contains(text(), 'Add Photo')]")
                     if (photo_buttons and len(photo_buttons) > 0):
                         driver.execute_script("arguments[0].click();", photo_buttons[0])
-                        time.sleep(0.3)  # Wait for file dialog to appear
                         
                         # Look for file input again
-                        file_inputs = driver.find_elements(By.XPATH, "//input[@type='file']")
-                        if (file_inputs and len(file_inputs) > 0):
-                            file_inputs[0].send_keys(image_paths[i])
-                            time.sleep(0.1)
+                        file_input_element = wait_for(driver, element_present(file_input), "file input", debug=debug)
+                        if file_input_element:
+                            file_input_element.send_keys(image)
+                            wait_for(driver, thumbnails_rendered(baseline + 1), "primary image thumbnail", timeout=UPLOAD_TIMEOUT, debug=debug)
                             uploaded_count += 1
                             print(f"[📸] Uploaded primary image: {os.path.basename(image)}")
             else:  # For additional images
@@ -279,17 +347,17 @@ def upload_images(driver, image_paths, debug=False):
                     if suitable_button:
                         # Scroll to the button
                         driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", suitable_button)
-                        time.sleep(0.1)
+                        wait_for(driver, element_in_view(suitable_button), "add photo button in view", debug=debug)
                         
                         # Click the button
                         driver.execute_script("arguments[0].click();", suitable_button)
                         # time.sleep(0.5)
                         
                         # Look for file input
-                        file_inputs = driver.find_elements(By.XPATH, "//input[@type='file']")
-                        if (file_inputs and len(file_inputs) > 0):
-                            file_inputs[0].send_keys(image)
-                            time.sleep(0.1)
+                        file_input_element = wait_for(driver, element_present(file_input), "file input", debug=debug)
+                        if file_input_element:
+                            file_input_element.send_keys(image)
+                            wait_for(driver, thumbnails_rendered(baseline + uploaded_count + 1), f"image {i+1} thumbnail", timeout=UPLOAD_TIMEOUT, debug=debug)
                             uploaded_count += 1
                             print(f"[📸] Uploaded additional image {i+1}: {os.path.basename(image)}")
                 else:
@@ -316,11 +384,10 @@ def upload_images(driver, image_paths, debug=False):
                     """)
                     
                     if clicked:
-                        time.sleep(0.1)
-                        file_inputs = driver.find_elements(By.XPATH, "//input[@type='file']")
-                        if (file_inputs and len(file_inputs) > 0):
-                            file_inputs[0].send_keys(image)
-                            time.sleep(0.1)
+                        file_input_element = wait_for(driver, element_present(file_input), "file input", debug=debug)
+                        if file_input_element:
+                            file_input_element.send_keys(image)
+                            wait_for(driver, thumbnails_rendered(baseline + uploaded_count + 1), f"image {i+1} thumbnail", timeout=UPLOAD_TIMEOUT, debug=debug)
                             uploaded_count += 1
                             print(f"[📸] Uploaded additional image {i+1}: {os.path.basename(image)}")
         
@@ -346,7 +413,7 @@ def set_location(driver, location_text, debug=False):
             more_details = driver.find_elements(By.XPATH, "//*[contains(text(), 'More details')]")
             if (more_details and len(more_details) > 0):
                 driver.execute_script("arguments[0].click();", more_details[0])
-                time.sleep(0.1)  # Reduced wait time
+                wait_for(driver, text_visible("Location"), "location field", debug=debug)
                 
                 # Try to find location field again
                 location_field = find_element_by_text(driver, "Location", debug=debug)
@@ -361,7 +428,7 @@ def set_location(driver, location_text, debug=False):
         
         # Enter new location
         location_field.send_keys(location_text)
-        time.sleep(0.5)  # Reduced wait time
+        wait_for(driver, dropdown_open(), "location suggestions", debug=debug)
         
         # Select first suggestion
         location_field.send_keys(Keys.DOWN, Keys.ENTER)
@@ -375,60 +442,45 @@ def set_location(driver, location_text, debug=False):
 
 def click_hide_from_friends(driver, debug=False):
     """Click the 'Hide from friends' option."""
-    try:
-        if debug:
-            print("[🔍] Looking for 'Hide from friends' option...")
-        
-        # Try multiple approaches to find and click the element
-        
-        # First approach: Direct text match
+    if debug:
+        print("[🔍] Looking for 'Hide from friends' option...")
+
+    def click_span_parent(driver):
+        # Direct text match, then click the parent div to activate the toggle
         hide_elements = driver.find_elements(By.XPATH, "//span[contains(text(), 'Hide from friends')]")
-        
-        if (hide_elements and len(hide_elements) > 0):
-            if debug:
-                print(f"[💡] Found {len(hide_elements)} 'Hide from friends' elements")
-            
-            # Click the parent div to activate the toggle
-            parent_div = driver.execute_script("""
-                var span = arguments[0];
-                // Go up to find a clickable parent
-                var element = span;
-                for (var i = 0; i < 5; i++) {
-                    if (!element.parentElement) break;
-                    element = element.parentElement;
-                    if (element.tagName.toLowerCase() === 'div' && 
-                        (element.onclick || 
-                         window.getComputedStyle(element).cursor === 'pointer')) {
-                        return element;
-                    }
+        if not hide_elements:
+            return False
+        if debug:
+            print(f"[💡] Found {len(hide_elements)} 'Hide from friends' elements")
+        parent_div = driver.execute_script("""
+            var span = arguments[0];
+            // Go up to find a clickable parent
+            var element = span;
+            for (var i = 0; i < 5; i++) {
+                if (!element.parentElement) break;
+                element = element.parentElement;
+                if (element.tagName.toLowerCase() === 'div' && 
+                    (element.onclick || 
+                     window.getComputedStyle(element).cursor === 'pointer')) {
+                    return element;
                 }
-                return span.parentElement;
-            """, hide_elements[0])
-            
-            # Scroll element into view
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", parent_div)
-            # time.sleep(1)
-            
-            # Click the element
-            driver.execute_script("arguments[0].click();", parent_div)
-            
-            if debug:
-                print("[✅] Clicked 'Hide from friends' option")
-            return True
-        
-        # Second approach: Look for similar text if exact match not found
+            }
+            return span.parentElement;
+        """, hide_elements[0])
+        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", parent_div)
+        driver.execute_script("arguments[0].click();", parent_div)
+        return True
+
+    def click_similar_text(driver):
+        # Look for similar text if the exact match is not there
         hide_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'Hide') and contains(text(), 'friends')]")
-        
-        if (hide_elements and len(hide_elements) > 0):
-            if debug:
-                print(f"[💡] Found {len(hide_elements)} alternative 'Hide from friends' elements")
-            driver.execute_script("arguments[0].click();", hide_elements[0])
-            if debug:
-                print("[✅] Clicked 'Hide from friends' option (alternative)")
-            return True
-        
-        # Try JavaScript approach as last resort
-        hide_clicked = driver.execute_script("""
+        if not hide_elements:
+            return False
+        driver.execute_script("arguments[0].click();", hide_elements[0])
+        return True
+
+    def click_scan(driver):
+        return driver.execute_script("""
             var elements = document.querySelectorAll('span, div');
             for (var i = 0; i < elements.length; i++) {
                 var text = elements[i].textContent || '';
@@ -446,167 +498,90 @@ def click_hide_from_friends(driver, debug=False):
             }
             return false;
         """)
-        
-        if hide_clicked:
-            if debug:
-                print("[✅] Clicked 'Hide from friends' using JavaScript")
-            return True
-        else:
-            if debug:
-                print("[⚠️] Could not find 'Hide from friends' option")
-            return False
-        
-    except Exception as e:
-        if debug:
-            print(f"[❌] Error clicking 'Hide from friends': {e}")
-        return False
 
-def publish_listing(driver, debug=False):
-    """Click Next, then Publish to complete the listing."""
-    try:
-        if debug:
-            print("[🔍] Looking for 'Next' button...")
-        
-        # First click Next
-        next_clicked = False
-        
-        # Try multiple approaches to find the Next button
-        # Approach 1: Look for the text directly
-        next_buttons = driver.find_elements(By.XPATH, "//span[contains(text(), 'Next')]")
-        
-        if (next_buttons and len(next_buttons) > 0):
-            for button in next_buttons:
-                try:
-                    # Find the clickable parent
-                    clickable = driver.execute_script("""
-                        var element = arguments[0];
-                        // Go up to find a clickable parent
-                        for (var i = 0; i < 5; i++) {
-                            if (element.tagName.toLowerCase() === 'button' || 
-                                element.tagName.toLowerCase() === 'a' || 
-                                element.getAttribute('role') === 'button' ||
-                                element.onclick) {
-                                return element;
-                            }
-                            if (!element.parentElement) break;
-                            element = element.parentElement;
+    # The scan clicks any element containing the text and nearly always "works", and there
+    # is no reliable check of the toggle, so the strategies keep their order
+    clicked = get_registry().locate(driver, "toggle:Hide from friends", [
+        ("span_parent", click_span_parent),
+        ("similar_text", click_similar_text),
+        ("js_scan", click_scan),
+    ], adaptive=False, debug=debug)
+
+    if debug:
+        print("[✅] Clicked 'Hide from friends' option" if clicked else "[⚠️] Could not find 'Hide from friends' option")
+    return bool(clicked)
+
+def click_button_by_text(driver, text, verify=None, debug=False):
+    """
+    Click the button labelled text. With a verify(driver) check of the page after the click,
+    the strategy that worked fastest before is tried first; without one the order is fixed.
+    """
+    if debug:
+        print(f"[🔍] Looking for '{text}' button...")
+
+    def click_span_parent(driver):
+        # Find the span with the text and click its clickable parent
+        for button in driver.find_elements(By.XPATH, f"//span[contains(text(), '{text}')]"):
+            try:
+                clickable = driver.execute_script("""
+                    var element = arguments[0];
+                    // Go up to find a clickable parent
+                    for (var i = 0; i < 5; i++) {
+                        if (element.tagName.toLowerCase() === 'button' || 
+                            element.tagName.toLowerCase() === 'a' || 
+                            element.getAttribute('role') === 'button' ||
+                            element.onclick) {
+                            return element;
                         }
-                        return arguments[0].parentElement;
-                    """, button)
-                    
-                    # Scroll to it
-                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", clickable)
-                    # time.sleep(0.5)
-                    
-                    # Click it
-                    driver.execute_script("arguments[0].click();", clickable)
-                    next_clicked = True
-                    
-                    if debug:
-                        print("[✅] Clicked 'Next' button")
-                    
-                    break
-                except Exception as e:
-                    if debug:
-                        print(f"[⚠️] Error clicking this 'Next' button: {e}")
-        
-        # If direct approach didn't work, try JavaScript
-        if not next_clicked:
-            if debug:
-                print("[🔍] Trying JavaScript approach for 'Next' button...")
-            
-            clicked = driver.execute_script("""
-                // Look for buttons or clickable elements containing 'Next'
-                var elements = document.querySelectorAll('button, [role="button"], div, span');
-                for (var i = 0; i < elements.length; i++) {
-                    if (elements[i].textContent.includes('Next') && 
-                        elements[i].offsetParent !== null) {
-                        elements[i].scrollIntoView({behavior: 'smooth', block: 'center'});
-                        elements[i].click();
-                        return true;
+                        if (!element.parentElement) break;
+                        element = element.parentElement;
                     }
-                }
-                return false;
-            """)
-            
-            if clicked:
-                if debug:
-                    print("[✅] Clicked 'Next' button using JavaScript")
-                next_clicked = True
-                time.sleep(.1)
-        
-        # Now look for the Publish button
-        if next_clicked:
-            if debug:
-                print("[🔍] Looking for 'Publish' button...")
-            
-            # Approach 1: Look for the text directly
-            publish_buttons = driver.find_elements(By.XPATH, "//span[contains(text(), 'Publish')]")
-            
-            if (publish_buttons and len(publish_buttons) > 0):
-                for button in publish_buttons:
-                    try:
-                        # Find the clickable parent
-                        clickable = driver.execute_script("""
-                            var element = arguments[0];
-                            // Go up to find a clickable parent
-                            for (var i = 0; i < 5; i++) {
-                                if (element.tagName.toLowerCase() === 'button' || 
-                                    element.tagName.toLowerCase() === 'a' || 
-                                    element.getAttribute('role') === 'button' ||
-                                    element.onclick) {
-                                    return element;
-                                }
-                                if (!element.parentElement) break;
-                                element = element.parentElement;
-                            }
-                            return arguments[0].parentElement;
-                        """, button)
-                        
-                        # Scroll to it
-                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", clickable)
-                        time.sleep(0.2)
-                        
-                        # Click it
-                        driver.execute_script("arguments[0].click();", clickable)
-                        
-                        if debug:
-                            print("[✅] Clicked 'Publish' button")
-                        
-                        # Wait for publishing to complete
-                        # time.sleep(3)
-                        return True
-                    except Exception as e:
-                        if debug:
-                            print(f"[⚠️] Error clicking this 'Publish' button: {e}")
-            
-            # If direct approach didn't work, try JavaScript
-            if debug:
-                print("[🔍] Trying JavaScript approach for 'Publish' button...")
-            
-            clicked = driver.execute_script("""
-                // Look for buttons or clickable elements containing 'Publish'
-                var elements = document.querySelectorAll('button, [role="button"], div, span');
-                for (var i = 0; i < elements.length; i++) {
-                    if (elements[i].textContent.includes('Publish') && 
-                        elements[i].offsetParent !== null) {
-                        elements[i].scrollIntoView({behavior: 'smooth', block: 'center'});
-                        elements[i].click();
-                        return true;
-                    }
-                }
-                return false;
-            """)
-            
-            if clicked:
-                if debug:
-                    print("[✅] Clicked 'Publish' button using JavaScript")
-                # time.sleep(3)
+                    return arguments[0].parentElement;
+                """, button)
+                driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", clickable)
+                wait_for(driver, element_in_view(clickable), f"{text} button in view", debug=debug)
+                driver.execute_script("arguments[0].click();", clickable)
                 return True
-        
-        if debug:
-            print("[⚠️] Could not find 'Publish' button")
+            except Exception as e:
+                if debug:
+                    print(f"[⚠️] Error clicking this '{text}' button: {e}")
         return False
+
+    def click_scan(driver):
+        # Look for buttons or clickable elements containing the text
+        return driver.execute_script("""
+            var text = arguments[0];
+            var elements = document.querySelectorAll('button, [role="button"], div, span');
+            for (var i = 0; i < elements.length; i++) {
+                if (elements[i].textContent.includes(text) && 
+                    elements[i].offsetParent !== null) {
+                    elements[i].scrollIntoView({behavior: 'smooth', block: 'center'});
+                    elements[i].click();
+                    return true;
+                }
+            }
+            return false;
+        """, text)
+
+    clicked = get_registry().locate(driver, f"button:{text}", [
+        ("span_parent", click_span_parent),
+        ("js_scan", click_scan),
+    ], verify=verify, adaptive=verify is not None, debug=debug)
+
+    if debug:
+        print(f"[✅] Clicked '{text}' button" if clicked else f"[⚠️] Could not find '{text}' button")
+    return bool(clicked)
+
+def publish_listing(driver, debug=False):
+    """Click Next, then Publish to complete the listing."""
+    try:
+        def publish_step(driver):
+            # Next only counts as clicked once the Publish step shows up
+            return wait_for(driver, text_visible("Publish"), "publish step", debug=debug)
+
+        if not click_button_by_text(driver, "Next", verify=publish_step, debug=debug):
+            return False
+        return click_button_by_text(driver, "Publish", debug=debug)
     
     except Exception as e:
         if debug:
@@ -641,6 +616,8 @@ def handle_redirect_warning(driver, debug=False):
             elements = driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]")
             if (elements and len(elements) > 0):
                 print(f"[⚠️] Detected warning: '{text}'")
+                # Texts like "Continue" also match the page itself, so only wait briefly for the dialog to go
+                dialog = enclosing_dialog(driver, elements[0])
                 
                 # Look for "Stay on Page" or "Continue" buttons
                 stay_buttons = driver.find_elements(By.XPATH, 
@@ -653,7 +630,8 @@ def handle_redirect_warning(driver, debug=False):
                         if button.is_displayed():
                             driver.execute_script("arguments[0].click();", button)
                             print("[✅] Clicked button to resolve warning")
-                            time.sleep(.2)  # Wait for dialog to close
+                            wait_for(driver, element_gone(dialog), "warning dialog to close",
+                                     timeout=DIALOG_TIMEOUT, debug=debug)
                             return True
                 
                 # If no specific button found, just click the first clickable element in the dialog
@@ -692,7 +670,8 @@ def handle_redirect_warning(driver, debug=False):
                     
                     driver.execute_script("arguments[0].click();", parent)
                     print("[✅] Clicked element to dismiss warning")
-                    time.sleep(.1)
+                    wait_for(driver, element_gone(dialog), "warning dialog to close",
+                             timeout=DIALOG_TIMEOUT, debug=debug)
                     return True
         
         # Method 2: Check for Chrome's built-in redirect warning
@@ -704,7 +683,7 @@ def handle_redirect_warning(driver, debug=False):
             print(f"[⚠️] Detected browser alert: {alert_text}")
             alert.dismiss()  # Click "Cancel" or "Stay"
             print("[✅] Dismissed browser alert")
-            time.sleep(.1)
+            wait_for(driver, alert_closed(), "browser alert to close", debug=debug)
             return True
         except:
             pass
@@ -714,14 +693,14 @@ def handle_redirect_warning(driver, debug=False):
             print("[⚠️] Detected too many redirects error page")
             # Go back to marketplace
             driver.get("https://www.facebook.com/marketplace/create/item")
-            time.sleep(.3)
+            wait_for(driver, navigation_finished(), "create page to load", timeout=NAVIGATION_TIMEOUT, debug=debug)
             return True
             
         # Method 4: Check if current URL indicates an error
         if "error" in driver.current_url or "problem" in driver.current_url:
             print("[⚠️] Detected error in URL")
             driver.get("https://www.facebook.com/marketplace/create/item")
-            time.sleep(.3)
+            wait_for(driver, navigation_finished(), "create page to load", timeout=NAVIGATION_TIMEOUT, debug=debug)
             return True
         
         return False  # No warning detected
@@ -785,26 +764,29 @@ def retry_failed_action(driver, action_function, action_args=None, max_retries=2
                 current_url = driver.current_url
                 if "marketplace/create" not in current_url:
                     driver.get("https://www.facebook.com/marketplace/create/item")
-                    time.sleep(.3)
                 else:
                     # Just refresh the current page
                     driver.refresh()
-                    time.sleep(.3)
+                wait_for(driver, navigation_finished(), "page to reload", timeout=NAVIGATION_TIMEOUT, debug=debug)
             except:
                 # If refresh fails, go back to marketplace
                 driver.get("https://www.facebook.com/marketplace/create/item")
-                time.sleep(.3)
+                wait_for(driver, navigation_finished(), "create page to load", timeout=NAVIGATION_TIMEOUT, debug=debug)
     
     # If we get here, all retries failed
     print("[❌] Action failed after all retry attempts")
     return False
 
-def post_listing(driver, title, price, description, location, images, category=None, attempt = 1, max_attempts=5):
+def post_listing(driver, title, price, description, location, images, category=None, attempt = 1, max_attempts=5, on_progress=None):
+    """Fill in and publish one Marketplace listing. on_progress(state) is called when the images are uploaded."""
     global DEBUG_MODE, AUTO_PUBLISH
     debug = DEBUG_MODE  # Use global debug setting
     
     print(f"[📄] Posting: {title}")
+    wait_stats.reset()
     driver.get("https://www.facebook.com/marketplace/create/item")
+    wait_for(driver, navigation_finished(), "create page to load", timeout=NAVIGATION_TIMEOUT, debug=debug)
+    wait_for(driver, text_visible("Title"), "listing form", debug=debug)
     
     try:
 
@@ -812,129 +794,143 @@ def post_listing(driver, title, price, description, location, images, category=N
         # 1. Upload images FIRST
         if images:
             print("[🔍] Uploading images...")
-            # Convert single image path to list if needed
-            # if isinstance(image_path, str):
-            #     image_paths = [image_paths]
-                
-            # Filter out non-existent images
-            valid_images = images.strip()[1:-1].split(',') 
-            # valid_images = [img for img in image_path if img and os.path.exists(img)]
+            # Callers that read the CSV pass the parsed path list; a raw images column is parsed here
+            valid_images = images if isinstance(images, list) else resolve_image_paths(images)
 
             if valid_images:
                 if upload_images(driver, valid_images, debug=debug):
                     print("[📸] Images uploaded successfully")
+                    if on_progress:
+                        on_progress("images_uploaded")
                 else:
                     handle_redirect_warning(driver, debug=debug)
                     print("[⚠️] Failed to upload images")
             else:
                 print("[⚠️] No valid images to upload")
         
+        # 2. Title, 3. Price and 6. Description are set in one browser call;
+        # the Selenium steps below only run for fields it could not set
+        parts = description.split('[BREAK]')
+        description_text = parts[0]
+        if len(parts) > 1:
+            description_text += "\n\n" + parts[1].strip("'")
+        form = fill_form(driver, [
+            form_field("title", "Title", title),
+            form_field("price", "Price", price),
+            form_field("description", "Description", description_text, tag="textarea"),
+        ], debug=debug)
+        
         # 2. Title
-        print("[🔍] Finding title field...")
-        title_input = find_element_by_text(driver, "Title", debug=debug)
-        if title_input:
-            title_input.send_keys(title)
-            print("[✅] Title entered")
-        else:
-            handle_redirect_warning(driver, debug=debug)
-            print("[❌] Could not find title field")
-            return False
+        if not form["title"]["ok"]:
+            print("[🔍] Finding title field...")
+            title_input = find_element_by_text(driver, "Title", debug=debug)
+            if title_input:
+                if form["title"]["found"]:
+                    # Clear what the form fill left behind before typing
+                    title_input.send_keys(Keys.CONTROL + "a", Keys.DELETE)
+                title_input.send_keys(title)
+                print("[✅] Title entered")
+            else:
+                handle_redirect_warning(driver, debug=debug)
+                print("[❌] Could not find title field")
+                return False
         # time.sleep(random.uniform(0.2, 0.5))
         
         # 3. Price
-        print("[🔍] Finding price field...")
-        try:
-            # First try to find the label/span with "Price" text
-            price_label = find_element_by_text(driver, "Price", debug=debug)
+        if not form["price"]["ok"]:
+            print("[🔍] Finding price field...")
+            try:
+                # First try to find the label/span with "Price" text
+                price_label = find_element_by_text(driver, "Price", debug=debug)
             
-            if price_label:
-                print("[✓] Found price label, now finding the associated input")
+                if price_label:
+                    print("[✓] Found price label, now finding the associated input")
                 
-                # Use JavaScript to find the actual input element (sibling or child)
-                price_input = driver.execute_script("""
-                    var label = arguments[0];
+                    # Use JavaScript to find the actual input element (sibling or child)
+                    price_input = driver.execute_script("""
+                        var label = arguments[0];
                     
-                    // Try to find the input in the same container
-                    var container = label.closest('div');
-                    if (container) {
-                        var input = container.querySelector('input[type="text"]');
-                        if (input) return input;
-                    }
+                        // Try to find the input in the same container
+                        var container = label.closest('div');
+                        if (container) {
+                            var input = container.querySelector('input[type="text"]');
+                            if (input) return input;
+                        }
                     
-                    // If not found, look for inputs near the label
-                    var inputs = document.querySelectorAll('input[type="text"]');
-                    for (var i = 0; i < inputs.length; i++) {
-                        var rect1 = label.getBoundingClientRect();
-                        var rect2 = inputs[i].getBoundingClientRect();
-                        // Check if input is near the label (within reasonable distance)
-                        if (Math.abs(rect1.top - rect2.top) < 50) {
-                            return inputs[i];
+                        // If not found, look for inputs near the label
+                        var inputs = document.querySelectorAll('input[type="text"]');
+                        for (var i = 0; i < inputs.length; i++) {
+                            var rect1 = label.getBoundingClientRect();
+                            var rect2 = inputs[i].getBoundingClientRect();
+                            // Check if input is near the label (within reasonable distance)
+                            if (Math.abs(rect1.top - rect2.top) < 50) {
+                                return inputs[i];
+                            }
                         }
-                    }
-                    return null;
-                """, price_label)
+                        return null;
+                    """, price_label)
                 
-                if price_input:
-                    # More human-like interaction
-                    price_str = str(price)
+                    if price_input:
+                        # More human-like interaction
+                        price_str = str(price)
                     
-                    # 1. Focus the element first
-                    driver.execute_script("arguments[0].focus();", price_input)
-                    time.sleep(0.1)
+                        # 1. Focus the element first
+                        driver.execute_script("arguments[0].focus();", price_input)
+                        wait_for(driver, element_focused(price_input), "price field focus", debug=debug)
                     
-                    # 2. Clear using backspace/delete to be more human-like
-                    driver.execute_script("""
-                        var input = arguments[0];
-                        input.value = '';
-                        input.dispatchEvent(new Event('input', { bubbles: true }));
-                    """, price_input)
+                        # 2. Clear using backspace/delete to be more human-like
+                        driver.execute_script("""
+                            var input = arguments[0];
+                            input.value = '';
+                            input.dispatchEvent(new Event('input', { bubbles: true }));
+                        """, price_input)
                     
-                    # 3. Type the price character by character like a human would
-                    for char in price_str:
-                        ActionChains(driver).send_keys(char).pause(0.05).perform()
+                        # 3. Type the price character by character like a human would
+                        for char in price_str:
+                            ActionChains(driver).send_keys(char).pause(0.05).perform()
                     
-                    # 4. Press Tab to move to next field (this often triggers validation)
-                    ActionChains(driver).send_keys(Keys.TAB).perform()
+                        # 4. Press Tab to move to next field (this often triggers validation)
+                        ActionChains(driver).send_keys(Keys.TAB).perform()
                     
-                    print(f"[✅] Price set to {price_str} using human-like typing")
-                    time.sleep(0.5)  # Wait for validation
+                        print(f"[✅] Price set to {price_str} using human-like typing")
+                        wait_for(driver, value_equals(price_input, price_str), "price validation", timeout=1, debug=debug)
                     
-                    # 5. Verify the price was set correctly
-                    current_value = driver.execute_script("return arguments[0].value;", price_input)
-                    if current_value != price_str:
-                        print(f"[⚠️] Price verification failed. Expected: {price_str}, Found: {current_value}")
+                        # 5. Verify the price was set correctly
+                        current_value = driver.execute_script("return arguments[0].value;", price_input)
+                        if current_value != price_str:
+                            print(f"[⚠️] Price verification failed. Expected: {price_str}, Found: {current_value}")
                         
-                        # Try one more time with direct method
-                        driver.execute_script("""
-                            var input = arguments[0];
-                            var value = arguments[1];
-                            input.value = value;
+                            # Try one more time with direct method
+                            driver.execute_script("""
+                                var input = arguments[0];
+                                var value = arguments[1];
+                                input.value = value;
                             
-                            // More extensive event simulation
-                            input.dispatchEvent(new Event('input', { bubbles: true }));
-                            input.dispatchEvent(new Event('change', { bubbles: true }));
-                            input.dispatchEvent(new Event('blur', { bubbles: true }));
+                                // More extensive event simulation
+                                input.dispatchEvent(new Event('input', { bubbles: true }));
+                                input.dispatchEvent(new Event('change', { bubbles: true }));
+                                input.dispatchEvent(new Event('blur', { bubbles: true }));
                             
-                            // Use React's synthetic events if available
-                            if (window.React && window.React.__SECRET_INTERNALS_DO_NOT_USE_OR_YOU_WILL_BE_FIRED) {
-                                // Try to trigger React's synthetic events
-                                var nativeInputValueSetter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
-                                nativeInputValueSetter.call(input, value);
-                            }
-                        """, price_input, price_str)
+                                // Use React's synthetic events if available
+                                if (window.React && window.React.__SECRET_INTERNALS_DO_NOT_USE_OR_YOU_WILL_BE_FIRED) {
+                                    // Try to trigger React's synthetic events
+                                    var nativeInputValueSetter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, 'value').set;
+                                    nativeInputValueSetter.call(input, value);
+                                }
+                            """, price_input, price_str)
                         
-                        ActionChains(driver).send_keys(Keys.TAB).perform()
-                        print("[🔄] Attempted alternative price setting method")
+                            ActionChains(driver).send_keys(Keys.TAB).perform()
+                            print("[🔄] Attempted alternative price setting method")
                     
-                else:
-                    handle_redirect_warning(driver, debug=debug)
-                    print("[❌] Could not find price field")
-                    return False
+                    else:
+                        handle_redirect_warning(driver, debug=debug)
+                        print("[❌] Could not find price field")
+                        return False
                 
-        except Exception as e:
-            print(f"[❌] Error entering price: {e}")
-            handle_redirect_warning(driver, debug=debug)
-            return False
+            except Exception as e:
+                print(f"[❌] Error entering price: {e}")
+                handle_redirect_warning(driver, debug=debug)
+                return False
         # time.sleep(random.uniform(0.8, 1.2))
         
         # 4. Category
@@ -947,7 +943,7 @@ def post_listing(driver, title, price, description, location, images, category=N
             category_input.send_keys(Keys.DOWN)
             category_input.send_keys(Keys.ENTER)
             # driver.execute_script("arguments[0].click();", category_input)
-            time.sleep(.2)  # Allow dropdown to open fully
+            wait_for(driver, text_visible("Miscellaneous"), "category dropdown", debug=debug)
             
             try:
                 # Try multiple selectors for Miscellaneous in the dropdown
@@ -1006,7 +1002,7 @@ def post_listing(driver, title, price, description, location, images, category=N
             driver.execute_script("arguments[0].click();", condition_combobox)
             
             # Wait for dropdown to open
-            time.sleep(.1)
+            wait_for(driver, dropdown_open(), "condition dropdown", debug=debug)
             
             # Look for "Used - Good" in the options
             good_options = driver.find_elements(By.XPATH, "//*[contains(text(), 'Used - Good') or contains(text(), 'Good')]")
@@ -1041,19 +1037,21 @@ def post_listing(driver, title, price, description, location, images, category=N
         # time.sleep(random.uniform(0.8, 1.2))
         
         # 6. Description
-        print("[🔍] Finding description field...")
-        desc_input = find_element_by_text(driver, "Description", element_type="textarea", debug=debug)
+        if not form["description"]["ok"]:
+            print("[🔍] Finding description field...")
+            desc_input = find_element_by_text(driver, "Description", element_type="textarea", debug=debug)
         
-        if desc_input:
-            parts = description.split('[BREAK]')
-            print(parts)
-            desc_input.send_keys(parts[0])
-            desc_input.send_keys(Keys.ENTER)  # Creates a line break
-            desc_input.send_keys(Keys.ENTER)  # Double line break
-            desc_input.send_keys(parts[1].strip("'"))
-        else:
-            print("[❌] Could not find description field")
-            # Don't return False here since we've already filled out other fields
+            if desc_input:
+                if form["description"]["found"]:
+                    # Clear what the form fill left behind before typing
+                    desc_input.send_keys(Keys.CONTROL + "a", Keys.DELETE)
+                desc_input.send_keys(parts[0])
+                desc_input.send_keys(Keys.ENTER)  # Creates a line break
+                desc_input.send_keys(Keys.ENTER)  # Double line break
+                desc_input.send_keys(parts[1].strip("'"))
+            else:
+                print("[❌] Could not find description field")
+                # Don't return False here since we've already filled out other fields
         # time.sleep(random.uniform(0.8, 1.2))
         
         # 7. Location
@@ -1080,21 +1078,32 @@ def post_listing(driver, title, price, description, location, images, category=N
             else:
                 print("[❌] Failed to auto-publish the listing")
                 if attempt < max_attempts:
-                    print(f"[🔄] Retrying to post listing... attempt {attempt}/3")
-                    post_listing(driver, title, price, description, location, images, category, attempt+1)
-                else:
+                    print(f"[🔄] Retrying to post listing... attempt {attempt + 1}/{max_attempts}")
+                    return post_listing(driver, title, price, description, location, images, category, attempt+1,
+                                        max_attempts=max_attempts, on_progress=on_progress)
+                elif INTERACTIVE:
                     print("[❌] Too many attempts, need manual fix...")
                     print("[🧍] Review post manually, then press Enter to continue...")
                     input()
-        else:
+                else:
+                    print("[❌] Too many attempts, giving up on this listing")
+                    return False
+        elif INTERACTIVE:
             print("[🧍] Review post manually, then press Enter to continue...")
             input()
+        else:
+            print("[⚠️] Left unpublished for manual review (no prompts in this mode)")
         
+        print(f"[⏱️] Page waits: {wait_stats.summary()}")
+        get_registry().save()
         return True
         
     except Exception as e:
         print(f"[❌] Error posting '{title}': {e}")
-        input("🛑 Fix the issue and press Enter to retry or continue...")
+        print(f"[⏱️] Page waits: {wait_stats.summary()}")
+        get_registry().save()
+        if INTERACTIVE:
+            input("🛑 Fix the issue and press Enter to retry or continue...")
         return False
 
 def reset_browser_state(driver):
@@ -1119,11 +1128,15 @@ def reset_browser_state(driver):
     
     # Navigate away and back
     driver.get("https://www.facebook.com")
-    time.sleep(.1)
+    wait_for(driver, navigation_finished(), "home page to load", timeout=NAVIGATION_TIMEOUT)
     
     return True
 
-def main():
+def main(profiles=None):
+    """
+    Fetch, renew and post today's listings.
+    With several profiles, listings are posted in parallel with one browser per profile.
+    """
     global DEBUG_MODE, AUTO_PUBLISH
     DEBUG_MODE = False
     AUTO_PUBLISH = True
@@ -1131,7 +1144,7 @@ def main():
     sys.path.append(os.path.dirname(os.path.relpath("/fb_renewListings.py")))
     from fb_fetchData import main as fetch_main
     from fb_renewListings import main as renew_main
-    driver = get_driver()
+    driver = get_driver(profile=profiles[0] if profiles else None)
 
     
     fetch_main()
@@ -1165,59 +1178,93 @@ def main():
         print(f"\n[📂] Reading listings from {csv_path}...")
         
         try:
-            with open(csv_path, newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                listings = list(reader)
-                
-                if not listings:
-                    print("[⚠️] No listings found in the CSV file.")
-                    return
-                
-                print(f"[📊] Found {len(listings)} listings to post.")
+            listings = read_listings_csv(csv_path)
+            
+            if not listings:
+                print("[⚠️] No listings found in the CSV file.")
+                return
+            
+            print(f"[📊] Found {len(listings)} listings to post.")
+            
+            # Check every row and its images up front so the browser only gets rows that can succeed
+            report_path = os.path.join(os.path.dirname(csv_path), "preflight_rejects.csv")
+            listings = preflight(listings, report_path)
+            if not listings:
+                print("[⚠️] No listings passed the pre-flight checks.")
+                return
+            
+            
+            # Journal of how far each listing got, so a rerun skips what was already published
+            journal = PostingJournal(os.path.join(os.path.dirname(csv_path), "posting_journal.jsonl"))
+            
+            if profiles and len(profiles) > 1:
+                pending = [listing for listing in listings if journal.state(listing) != "published"]
+                print(f"[⏭️] {len(listings) - len(pending)} listings already posted earlier")
+                # Each worker opens its own browser; the first profile must not stay open here
+                driver.quit()
+                post_listings_parallel(pending, profiles, journal.path, auto_publish=AUTO_PUBLISH)
+                return
+            
+            successful = 0
+            skipped = 0
+            for i, listing in enumerate(listings, 1):
+                state = journal.state(listing)
+                if state == "published":
+                    skipped += 1
+                    print(f"\n[⏭️] Already posted, skipping listing {i}: {listing.title}")
+                    continue
+                if state:
+                    # Marketplace keeps no half-filled form, so an interrupted listing starts over
+                    print(f"\n[↩️] Resuming listing {i} (interrupted after '{state}'): {listing.title}")
+                else:
+                    print(f"\n[🔄] Posting listing {i}: {listing.title or 'Unnamed listing'}")
                 
+                journal.record(listing, "started")
+                progress = lambda step, listing=listing: journal.record(listing, step)
                 
-                successful = 0
-                for i, row in enumerate(listings, 1):
-                    print(f"\n[🔄] Posting listing {i}: {row.get('title', 'Unnamed listing')}")
-                    
-                    # Pass the auto_publish and debug_mode values through the global variables
-                    success = post_listing(
-                        driver,
-                        title=row.get('title', ''),
-                        price=row.get('price', ''),
-                        description=row.get('description', ''),
-                        category=row.get('category'),
-                        location=row.get('location'),
-                        images=row.get('images')
-                    )
-                    
-                    if success:
-                        successful += 1
-                        print(f"[✅] Successfully posted: {row.get('title', 'Unnamed listing')}")
-                    else:
-                        print(f"[❌] Failed to post: {row.get('title', 'Unnamed listing')}")
-                        # Ask if user wants to retry or continue
-                        print("[❓] Retry this listing? (y/n, default: n)")
-                        retry = input("> ").lower() == "y"
-                        if retry:
-                            print("[🔄] Retrying...")
-                            if post_listing(
-                                driver,
-                                title=row.get('title', ''),
-                                price=row.get('price', ''),
-                                description=row.get('description', ''),
-                                category=row.get('category'),
-                                location=row.get('location'),
-                                images=row.get('image_path')
-                            ):
-                                successful += 1
-                                print(f"[✅] Successfully posted on retry: {row.get('title', 'Unnamed listing')}")
-                    
-                    # Ask if user wants to continue after each post
-                    reset_browser_state(driver)
+                # Pass the auto_publish and debug_mode values through the global variables
+                success = post_listing(
+                    driver,
+                    title=listing.title,
+                    price=listing.price,
+                    description=listing.description,
+                    category=listing.category,
+                    location=listing.location,
+                    images=listing.image_paths,
+                    on_progress=progress
+                )
                 
-                print(f"\n[📊] Summary: Posted {successful}/{i} listings successfully.")
+                if success:
+                    journal.record(listing, "published")
+                    successful += 1
+                    print(f"[✅] Successfully posted: {listing.title or 'Unnamed listing'}")
+                else:
+                    print(f"[❌] Failed to post: {listing.title or 'Unnamed listing'}")
+                    # Ask if user wants to retry or continue
+                    print("[❓] Retry this listing? (y/n, default: n)")
+                    retry = INTERACTIVE and input("> ").lower() == "y"
+                    if retry:
+                        print("[🔄] Retrying...")
+                        if post_listing(
+                            driver,
+                            title=listing.title,
+                            price=listing.price,
+                            description=listing.description,
+                            category=listing.category,
+                            location=listing.location,
+                            images=listing.image_paths,
+                            on_progress=progress
+                        ):
+                            journal.record(listing, "published")
+                            successful += 1
+                            print(f"[✅] Successfully posted on retry: {listing.title or 'Unnamed listing'}")
                 
+                # Ask if user wants to continue after each post
+                reset_browser_state(driver)
+            
+            print(f"\n[📊] Summary: Posted {successful}/{len(listings) - skipped} listings successfully"
+                  f" ({skipped} already posted earlier).")
+            
         except FileNotFoundError:
             print(f"[❌] CSV file not found: {csv_path}")
         except Exception as e:
@@ -1236,4 +1283,14 @@ def main():
         print("[👋] Goodbye!")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Post today's listings to Facebook Marketplace.")
+    parser.add_argument("--profiles", help="comma-separated profile names to post with in parallel, or 'all'")
+    args = parser.parse_args()
+    
+    profiles = None
+    if args.profiles == "all":
+        profiles = list_profiles()
+    elif args.profiles:
+        profiles = [name.strip() for name in args.profiles.split(",") if name.strip()]
+    main(profiles)
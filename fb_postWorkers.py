@@ -0,0 +1,128 @@
+import os
+import time
+import queue
+import multiprocessing
+
+# Per-profile rate limits, so no single account posts faster than a person would
+PROFILE_MIN_INTERVAL = 90  # Seconds between the starts of two posts from one profile
+PROFILE_MAX_POSTS = 25  # Posts per profile per run; the rest is left to other profiles
+RESULT_POLL_INTERVAL = 5  # Seconds between checks on the worker processes
+
+def posting_worker(profile, tasks, results, journal_path, auto_publish,
+                   min_interval=PROFILE_MIN_INTERVAL, max_posts=PROFILE_MAX_POSTS):
+    """
+    Post listings from the shared task queue with one browser on one profile.
+    Runs in its own process; puts (index, profile, success, seconds) on the results queue.
+    """
+    import fb_postListings
+    from fb_postingJournal import PostingJournal
+
+    name = os.path.basename(profile).replace(".fb_", "")
+    fb_postListings.AUTO_PUBLISH = auto_publish
+    # Nobody can answer a prompt from a background process
+    fb_postListings.INTERACTIVE = False
+
+    try:
+        driver = fb_postListings.get_driver(profile=profile)
+    except BaseException as e:
+        print(f"[❌] [{name}] Could not start the browser: {e}")
+        return
+
+    journal = PostingJournal(journal_path)
+    posted = 0
+    last_start = None
+
+    try:
+        while posted < max_posts:
+            try:
+                task = tasks.get(timeout=1)
+            except queue.Empty:
+                break
+            index, listing = task
+
+            if last_start is not None:
+                wait = min_interval - (time.monotonic() - last_start)
+                if wait > 0:
+                    print(f"[⏳] [{name}] Rate limit: waiting {wait:.0f}s before the next post")
+                    time.sleep(wait)
+            last_start = time.monotonic()
+
+            print(f"\n[🔄] [{name}] Posting listing {index}: {listing.title}")
+            journal.record(listing, "started")
+            try:
+                success = fb_postListings.post_listing(
+                    driver,
+                    title=listing.title,
+                    price=listing.price,
+                    description=listing.description,
+                    category=listing.category,
+                    location=listing.location,
+                    images=listing.image_paths,
+                    on_progress=lambda step: journal.record(listing, step)
+                )
+            except Exception as e:
+                print(f"[❌] [{name}] Error posting {listing.title}: {e}")
+                success = False
+
+            if success:
+                journal.record(listing, "published")
+                posted += 1
+            results.put((index, profile, success, time.monotonic() - last_start))
+            fb_postListings.reset_browser_state(driver)
+
+        if posted >= max_posts:
+            print(f"[🛑] [{name}] Reached {max_posts} posts for this run")
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+def post_listings_parallel(listings, profiles, journal_path, auto_publish=True,
+                           min_interval=PROFILE_MIN_INTERVAL, max_posts=PROFILE_MAX_POSTS):
+    """
+    Post listings with one browser process per profile, all pulling from one shared queue.
+    Returns a dict of profile → {"posted", "failed", "seconds"} plus the number never attempted.
+    """
+    context = multiprocessing.get_context("spawn")
+    tasks = context.Queue()
+    results = context.Queue()
+    for index, listing in enumerate(listings, 1):
+        tasks.put((index, listing))
+
+    print(f"[🚀] Posting {len(listings)} listings with {len(profiles)} profiles")
+    workers = [
+        context.Process(target=posting_worker, args=(profile, tasks, results, journal_path, auto_publish, min_interval, max_posts),
+                        name=f"post-{os.path.basename(profile)}")
+        for profile in profiles
+    ]
+    for worker in workers:
+        worker.start()
+
+    stats = {profile: {"posted": 0, "failed": 0, "seconds": 0.0} for profile in profiles}
+    attempted = 0
+    while attempted < len(listings):
+        try:
+            index, profile, success, seconds = results.get(timeout=RESULT_POLL_INTERVAL)
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                break
+            continue
+        attempted += 1
+        stats[profile]["posted" if success else "failed"] += 1
+        stats[profile]["seconds"] += seconds
+
+    for worker in workers:
+        worker.join()
+    # Rows left after every profile hit its limit are dropped, not flushed to a queue nobody reads
+    tasks.cancel_join_thread()
+
+    print(f"\n[📊] Parallel posting summary: {sum(s['posted'] for s in stats.values())}/{len(listings)} posted")
+    for profile, profile_stats in stats.items():
+        done = profile_stats["posted"] + profile_stats["failed"]
+        avg = profile_stats["seconds"] / done if done else 0.0
+        print(f"   - {os.path.basename(profile).replace('.fb_', '')}: {profile_stats['posted']} posted, "
+              f"{profile_stats['failed']} failed, avg {avg:.0f}s per listing")
+    if attempted < len(listings):
+        print(f"[⚠️] {len(listings) - attempted} listings were not attempted; run again to post them")
+    return stats, len(listings) - attempted
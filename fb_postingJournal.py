@@ -0,0 +1,45 @@
+import json
+import time
+import hashlib
+import threading
+from fb_jsonLines import JsonLines
+
+# Posting states, in the order a listing goes through them
+STATES = ("started", "images_uploaded", "published")
+
+def listing_fingerprint(listing):
+    """Return a short hash of the fields that end up in the Marketplace post."""
+    images = [entry.get("sha256") or entry["path"] for entry in listing.images]
+    content = json.dumps([listing.title, listing.price, listing.description, listing.location, images])
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+def journal_key(listing):
+    """Return the journal key of a listing: its id plus the fingerprint of its content."""
+    return f"{listing.id or 'no-id'}:{listing_fingerprint(listing)}"
+
+class PostingJournal:
+    """
+    Append-only, fsync'd record of how far each listing got in posting.
+
+    Each line of the journal holds a listing key, a state from STATES and
+    a timestamp; the last line for a key wins. A listing whose content
+    changes gets a new key, so an edited row is posted again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.lines = JsonLines(path)
+        self.states = {entry["key"]: entry["state"] for entry in self.lines.read("key", "state")}
+
+    def state(self, listing):
+        """Return the last recorded state of a listing, or None if it was never started."""
+        with self.lock:
+            return self.states.get(journal_key(listing))
+
+    def record(self, listing, state):
+        """Append a state change and make sure it is on disk before returning."""
+        entry = {"key": journal_key(listing), "state": state, "title": listing.title, "time": time.time()}
+        with self.lock:
+            self.states[entry["key"]] = state
+            self.lines.append(entry, sync=True)
@@ -0,0 +1,113 @@
+import os
+import csv
+from concurrent.futures import ThreadPoolExecutor
+
+# Marketplace limits and the format post_listing expects
+MAX_TITLE_LENGTH = 95  # Characters, including the "Rent a " prefix
+DESCRIPTION_BREAK = "[BREAK]"  # post_listing types the parts before and after it as two paragraphs
+PREFLIGHT_WORKERS = 8  # Threads checking listings (mostly image stats) at once
+
+def check_images(listing):
+    """
+    Stat every image of a listing once. Missing, empty or resized-since-written files are dropped.
+    Returns the problems found.
+    """
+    problems = []
+    kept = []
+    for entry, path in zip(listing.images, listing.image_paths):
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            problems.append(f"image not found: {entry['path']}")
+            continue
+        if size == 0:
+            problems.append(f"image is empty: {entry['path']}")
+            continue
+        if entry.get("size") is not None and entry["size"] != size:
+            problems.append(f"image size changed ({entry['size']} → {size} bytes): {entry['path']}")
+            continue
+        kept.append(entry)
+
+    if len(kept) != len(listing.images):
+        listing.set_images(kept)
+    return problems
+
+def validate_listing(listing):
+    """
+    Check and normalize one listing before it reaches the browser.
+    Returns (fatal problems, other problems); the listing can be posted only if the first list is empty.
+    """
+    fatal = []
+    fixed = []
+
+    listing.title = " ".join(listing.title.split())
+    if not listing.title:
+        fatal.append("missing title")
+    elif len(listing.title) > MAX_TITLE_LENGTH:
+        listing.title = listing.title[:MAX_TITLE_LENGTH - 3] + "..."
+        fixed.append(f"title truncated to {MAX_TITLE_LENGTH} characters")
+
+    if listing.price is None:
+        fatal.append("missing or unparsable price")
+
+    if not listing.location.strip():
+        # post_listing leaves the form's prefilled location when none is given
+        fixed.append("missing location")
+
+    if DESCRIPTION_BREAK not in listing.description:
+        # Everything becomes the first paragraph; the second one is left empty
+        listing.description = f"{listing.description} {DESCRIPTION_BREAK} "
+        fixed.append(f"description has no {DESCRIPTION_BREAK} marker")
+
+    image_problems = check_images(listing)
+    if not listing.images:
+        fatal.append("no usable images")
+        fatal += image_problems
+    else:
+        fixed += image_problems
+
+    return fatal, fixed
+
+def write_rejects_report(rejects, report_path):
+    """Write the rejected listings and the reasons to a CSV report."""
+    with open(report_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "problems"])
+        for listing, problems in rejects:
+            writer.writerow([listing.id or "", listing.title, "; ".join(problems)])
+
+def preflight(listings, report_path, max_workers=PREFLIGHT_WORKERS):
+    """
+    Validate and normalize every listing in parallel before any posting starts.
+    Rejected listings are written to report_path with their reasons.
+    Returns the listings that can be posted, in their original order.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(validate_listing, listings))
+
+    ready = []
+    rejects = []
+    seen_ids = set()
+    for listing, (fatal, fixed) in zip(listings, results):
+        if listing.id and listing.id in seen_ids:
+            fatal = fatal + ["duplicate listing id in CSV"]
+        if listing.id:
+            seen_ids.add(listing.id)
+
+        if fatal:
+            rejects.append((listing, fatal))
+            print(f"[🚫] Rejected {listing.title or 'Unnamed listing'}: {'; '.join(fatal)}")
+        else:
+            ready.append(listing)
+            for problem in fixed:
+                print(f"[🩹] {listing.title}: {problem}")
+
+    if rejects:
+        write_rejects_report(rejects, report_path)
+        print(f"[🧪] Pre-flight: {len(ready)} ready, {len(rejects)} rejected (see {report_path})")
+    else:
+        # A report left by an earlier run would list listings that are fine now
+        if os.path.exists(report_path):
+            os.remove(report_path)
+        print(f"[🧪] Pre-flight: all {len(ready)} listings ready")
+    return ready
@@ -2,12 +2,12 @@
 # if someone replies to the message, we reply again. Check if message has been sent
 
 import os
+import re
 import time
 import random
 import sqlite3
-import glob
-import csv
-import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -16,6 +16,57 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 # Import existing functions from your codebase
 from fb_postListings import get_driver, handle_redirect_warning
+from fb_http import get_client
+from fb_listingIndex import get_matcher, normalize_title, strip_ellipsis
+from fb_lookupCache import LookupCache
+
+# Most titles resolved by one batched GraphQL request
+BATCH_SIZE = 50
+MIN_PREFIX_LENGTH = 12  # Shortest shortened preview title trusted to identify a full title by prefix
+
+# Listing ID sources, highest priority first, with the seconds each may take
+LOOKUP_TIMEOUTS = {"database": 2, "api": 10, "csv": 2}
+PRIORITY_GRACE = 0.25  # Seconds a lower-priority answer waits for higher-priority sources
+
+class LookupStats:
+    """Per-source counters for the concurrent listing ID lookup."""
+    
+    def __init__(self, sources):
+        self.lock = threading.Lock()
+        self.stats = {name: {"calls": 0, "answers": 0, "wins": 0, "timeouts": 0, "errors": 0, "seconds": 0.0}
+                      for name in sources}
+    
+    def record(self, source, seconds, answered=False, error=False):
+        """Record one finished call to a source."""
+        with self.lock:
+            stats = self.stats[source]
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            stats["answers"] += answered
+            stats["errors"] += error
+    
+    def record_timeout(self, source):
+        """Record a call abandoned after the source's timeout."""
+        with self.lock:
+            self.stats[source]["timeouts"] += 1
+    
+    def record_win(self, source):
+        """Record that a source's answer was used."""
+        with self.lock:
+            self.stats[source]["wins"] += 1
+    
+    def summary(self):
+        """Return one summary line per source that was called."""
+        lines = []
+        with self.lock:
+            for name, stats in self.stats.items():
+                if not stats["calls"] and not stats["timeouts"]:
+                    continue
+                avg_ms = stats["seconds"] / stats["calls"] * 1000 if stats["calls"] else 0.0
+                lines.append(f"[🏁] Lookup {name}: {stats['wins']} wins, {stats['answers']} answers from "
+                             f"{stats['calls']} calls (avg {avg_ms:.0f} ms), "
+                             f"{stats['timeouts']} timeouts, {stats['errors']} errors")
+        return lines
 
 class FacebookMarketplaceResponder:
     def __init__(self, database_path=None, debug=False):
@@ -30,6 +81,18 @@ class FacebookMarketplaceResponder:
         self.database_path = database_path
         self.debug = debug
         
+        # API lookups by title and city, kept between runs
+        self.api_cache = LookupCache()
+        # Listing IDs found for inbox previews that Facebook shortened with an ellipsis,
+        # by normalized prefix; the opened thread shows the full title
+        self.preview_prefixes = {}  # prefix → set of listing IDs
+        
+        # Listing ID sources are queried concurrently, each on its own workers so calls
+        # abandoned by a slow source never hold up the others
+        self.lookup_executors = {name: ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"lookup-{name}")
+                                 for name in LOOKUP_TIMEOUTS}
+        self.lookup_stats = LookupStats(LOOKUP_TIMEOUTS)
+        
         # Response templates
         self.responses = [
             "Hey I'm actually listing this on a rental app called Yoodlize! Reach out to me there! https://www.yoodlize.com/details/{listing_id}",
@@ -339,52 +402,159 @@ class FacebookMarketplaceResponder:
             return None
     
     def find_listing_id_in_csv_files(self, title):
-        """Search through CSV files to find a listing ID based on title."""
+        """Look up a listing ID by the closest title across all listing CSV files."""
         print(f"[🔍] Searching CSV files for listing: '{title}'")
         
         try:
-            # Get all data directories in reverse chronological order
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            data_dirs = sorted(glob.glob(os.path.join(base_dir, "data_*")), reverse=True)
-            
-            for data_dir in data_dirs:
-                csv_files = glob.glob(os.path.join(data_dir, "listings_*.csv"))
-                
-                for csv_file in csv_files:
-                    if self.debug:
-                        print(f"[🔍] Checking {csv_file}")
-                    
-                    try:
-                        with open(csv_file, 'r', encoding='utf-8') as f:
-                            reader = csv.DictReader(f)
-                            
-                            for row in reader:
-                                row_title = row.get('title', '')
-                                
-                                # Clean up title for comparison
-                                if row_title.lower().startswith("rent a "):
-                                    row_title = row_title[7:].strip()
-                                
-                                # Check for a match
-                                if (title.lower() in row_title.lower() or 
-                                    row_title.lower() in title.lower()):
-                                    listing_id = row.get('id')
-                                    if listing_id:
-                                        print(f"[✅] Found listing ID in {csv_file}: {listing_id}")
-                                        return listing_id
-                    except Exception as e:
-                        if self.debug:
-                            print(f"[⚠️] Error reading {csv_file}: {e}")
+            started = time.perf_counter()
+            listing, score = get_matcher().match(title)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            
+            if listing:
+                listing_id = listing.id
+                print(f"[✅] Found listing ID in {listing.csv_file}: {listing_id} "
+                      f"(score {score:.2f}, {elapsed_ms:.2f} ms)")
+                if self.debug:
+                    print(f"[🔍] Matched title: {listing.title}")
+                return listing_id
             
-            print("[⚠️] No matching listing found in CSV files")
+            print(f"[⚠️] No matching listing found in CSV files (best score {score:.2f})")
             return None
             
         except Exception as e:
             print(f"[❌] Error searching CSV files: {e}")
             return None
     
+    def api_cache_key(self, title, city=None):
+        """Return the lookup cache key for a title and city."""
+        return f"{normalize_title(title)}|{(city or '').strip().lower()}"
+    
+    def preview_cache_key(self, title, shortened):
+        """Return the lookup cache key for a preview title; shortened ones get their own key."""
+        if shortened:
+            return f"{normalize_title(title)}…|"
+        return self.api_cache_key(title)
+    
+    def extract_title_from_preview(self, thread):
+        """
+        Read the listing title from an inbox thread preview ("Name · Rent a ...").
+        Returns (title, whether Facebook shortened it with an ellipsis), or None.
+        """
+        try:
+            for line in thread.text.split("\n"):
+                match = re.search(r"rent a (.+)", line, re.IGNORECASE)
+                if match:
+                    title, shortened = strip_ellipsis(match.group(1).strip())
+                    return (title, shortened) if title else None
+        except Exception as e:
+            if self.debug:
+                print(f"[⚠️] Could not read thread preview: {e}")
+        return None
+    
+    def remember_preview_prefix(self, title, listing_id):
+        """Remember the listing ID found for a shortened preview title."""
+        prefix = normalize_title(title)
+        if listing_id and len(prefix) >= MIN_PREFIX_LENGTH:
+            self.preview_prefixes.setdefault(prefix, set()).add(listing_id)
+    
+    def match_preview_prefix(self, title):
+        """
+        Return the listing ID of the shortened preview titles that a full title starts with.
+        Returns None unless they all point to the same single listing, so that two listings
+        sharing a prefix are told apart by the API instead.
+        """
+        norm_title = normalize_title(title)
+        listing_ids = set()
+        for prefix, ids in self.preview_prefixes.items():
+            if norm_title.startswith(prefix):
+                listing_ids |= ids
+        if len(listing_ids) != 1:
+            if len(listing_ids) > 1 and self.debug:
+                print(f"[⚠️] '{title}' matches shortened previews of {len(listing_ids)} listings, asking the API")
+            return None
+        return next(iter(listing_ids))
+    
+    def resolve_titles_using_api(self, previews):
+        """
+        Resolve many (title, shortened) preview titles with one aliased GraphQL request per BATCH_SIZE titles.
+        Titles already in the lookup cache are skipped and every answer is cached,
+        so the per-thread lookups that follow are served from the cache. Shortened titles
+        are also remembered as prefixes, which the full title of the opened thread starts with.
+        Returns a dict of title → listing ID (None when not found).
+        """
+        shortened_titles = {title for title, shortened in previews if shortened}
+        pending = []
+        for title, shortened in dict.fromkeys(previews):
+            cached, listing_id = self.api_cache.get(self.preview_cache_key(title, shortened))
+            if cached:
+                if shortened:
+                    self.remember_preview_prefix(title, listing_id)
+            elif title not in pending:
+                pending.append(title)
+        
+        results = {}
+        for start in range(0, len(pending), BATCH_SIZE):
+            batch = pending[start:start + BATCH_SIZE]
+            print(f"[🔍] Resolving {len(batch)} listing titles via API in one request")
+            
+            fields = []
+            variables = {}
+            for i, title in enumerate(batch):
+                # Match the title literally; % and _ are wildcards in _ilike
+                escaped = re.sub(r"([\\%_])", r"\\\1", title)
+                variables[f"t{i}"] = f"%{escaped}%"
+                fields.append(f"""
+                t{i}: listing(
+                    where: {{is_published: {{_eq: true}}, title: {{_ilike: $t{i}}}}},
+                    order_by: {{created_at: desc}},
+                    limit: 1
+                ) {{
+                    id
+                    title
+                }}""")
+            declarations = ", ".join(f"$t{i}: String!" for i in range(len(batch)))
+            graphql_query = f"query FindListings({declarations}) {{{''.join(fields)}\n            }}"
+            
+            try:
+                data = get_client().execute(graphql_query, variables, operation="find_listings_batch")
+            except Exception as e:
+                print(f"[❌] API error: {e}")
+                continue
+            
+            for i, title in enumerate(batch):
+                listings = data.get(f"t{i}") or []
+                listing_id = listings[0].get("id") if listings else None
+                shortened = title in shortened_titles
+                self.api_cache.put(self.preview_cache_key(title, shortened), listing_id)
+                if shortened:
+                    self.remember_preview_prefix(title, listing_id)
+                results[title] = listing_id
+            
+            found = sum(1 for title in batch if results.get(title))
+            print(f"[✅] Resolved {found}/{len(batch)} titles via API")
+        
+        return results
+    
     def find_listing_id_using_api(self, title, city=None):
-        """Query the Yoodlize GraphQL API to find the listing ID."""
+        """Query the Yoodlize GraphQL API to find the listing ID, answering repeat lookups from the cache."""
+        cache_key = self.api_cache_key(title, city)
+        cached, listing_id = self.api_cache.get(cache_key)
+        if not cached and city:
+            # Batched inbox lookups only know the title
+            cached, listing_id = self.api_cache.get(self.api_cache_key(title))
+        if cached:
+            if listing_id:
+                print(f"[🗃️] Found cached listing ID for '{title}': {listing_id}")
+            else:
+                print(f"[🗃️] Cached: no listing found via API for '{title}'")
+            return listing_id
+        
+        listing_id = self.match_preview_prefix(title)
+        if listing_id:
+            print(f"[🗃️] Found listing ID for '{title}' from its shortened inbox preview: {listing_id}")
+            self.api_cache.put(self.api_cache_key(title), listing_id)
+            return listing_id
+        
         try:
             print(f"[🔍] Querying API for listing: '{title}' in {city or 'any city'}")
             
@@ -412,32 +582,114 @@ class FacebookMarketplaceResponder:
                     "title: {_ilike: \"%TITLE_PLACEHOLDER%\"}, listing_addresses: {user_address: {city: {_ilike: \"%CITY_PLACEHOLDER%\"}}}"
                 ).replace("CITY_PLACEHOLDER", city)
             
-            # Make API request
-            response = requests.post(
-                "https://yoodlize-hasura.herokuapp.com/v1/graphql",
-                headers={"Content-Type": "application/json"},
-                json={"query": graphql_query}
-            )
+            # Make API request through the shared client (pooling, circuit breaker). One attempt
+            # bounded by the lookup deadline, so an abandoned call doesn't keep a worker busy
+            data = get_client().execute(graphql_query, operation="find_listing",
+                                        timeout=LOOKUP_TIMEOUTS["api"], max_retries=0)
+            listings = data.get("listing", [])
             
-            if response.status_code == 200:
-                data = response.json()
-                listings = data.get("data", {}).get("listing", [])
-                
-                if listings:
-                    listing_id = listings[0].get("id")
-                    print(f"[✅] Found listing ID via API: {listing_id}")
-                    return listing_id
-                else:
-                    print("[⚠️] No matching listing found via API")
-                    return None
+            if listings:
+                listing_id = listings[0].get("id")
+                print(f"[✅] Found listing ID via API: {listing_id}")
             else:
-                print(f"[❌] API request failed: {response.status_code}")
-                return None
+                listing_id = None
+                print("[⚠️] No matching listing found via API")
+            
+            # Only answers from the API are cached; errors below are retried next time
+            self.api_cache.put(cache_key, listing_id)
+            return listing_id
                 
         except Exception as e:
             print(f"[❌] API error: {e}")
             return None
     
+    def timed_lookup(self, source, lookup):
+        """Run one source's lookup and record its latency and outcome."""
+        started = time.perf_counter()
+        try:
+            listing_id = lookup()
+        except Exception as e:
+            self.lookup_stats.record(source, time.perf_counter() - started, error=True)
+            print(f"[❌] {source} lookup error: {e}")
+            return None
+        self.lookup_stats.record(source, time.perf_counter() - started, answered=bool(listing_id))
+        return listing_id
+    
+    def resolve_listing_id(self, title, city=None):
+        """
+        Look up a listing ID in the database, the API and the CSV files at the same time.
+        
+        An answer is used once every higher-priority source (in LOOKUP_TIMEOUTS order)
+        has finished without one, or after it has waited PRIORITY_GRACE seconds, so a
+        slow API call cannot hold back a local hit. Sources past their timeout count
+        as finished. Losing lookups are cancelled or left to finish in the background.
+        """
+        lookups = {
+            "database": lambda: self.find_listing_id_in_database(title, city),
+            "api": lambda: self.find_listing_id_using_api(title, city),
+            "csv": lambda: self.find_listing_id_in_csv_files(title),
+        }
+        order = [name for name in LOOKUP_TIMEOUTS if name != "database" or self.database_path]
+        
+        started = time.monotonic()
+        futures = {name: self.lookup_executors[name].submit(self.timed_lookup, name, lookups[name]) for name in order}
+        deadlines = {name: started + LOOKUP_TIMEOUTS[name] for name in order}
+        finished = set()
+        answers = {}
+        answered_at = {}
+        
+        def pick_winner(now):
+            for i, name in enumerate(order):
+                if name in answers:
+                    return name
+                if name not in finished:
+                    # Still running: a lower-priority answer wins only once its grace is up
+                    for lower in order[i + 1:]:
+                        if lower in answers and now - answered_at[lower] >= PRIORITY_GRACE:
+                            return lower
+                    return None
+            return None
+        
+        winner = None
+        while True:
+            now = time.monotonic()
+            for name in order:
+                if name in finished:
+                    continue
+                future = futures[name]
+                if future.done():
+                    finished.add(name)
+                    listing_id = future.result()
+                    if listing_id:
+                        answers[name] = listing_id
+                        answered_at[name] = now
+                elif now >= deadlines[name]:
+                    finished.add(name)
+                    self.lookup_stats.record_timeout(name)
+                    print(f"[⏱️] {name} lookup timed out after {LOOKUP_TIMEOUTS[name]}s")
+            
+            winner = pick_winner(now)
+            if winner or len(finished) == len(order):
+                break
+            
+            # Sleep until something finishes, a deadline passes or a grace period ends
+            wake_times = [deadlines[name] for name in order if name not in finished]
+            wake_times += [answered_at[name] + PRIORITY_GRACE for name in answers]
+            timeout = max(0.0, min(wake_times) - now)
+            wait([futures[name] for name in order if name not in finished], timeout=timeout, return_when=FIRST_COMPLETED)
+        
+        for name in order:
+            if name not in finished:
+                futures[name].cancel()
+        
+        if not winner:
+            return None
+        
+        self.lookup_stats.record_win(winner)
+        elapsed_ms = (time.monotonic() - started) * 1000
+        print(f"[🏁] Using listing ID {answers[winner]} from {winner} lookup ({elapsed_ms:.0f} ms)")
+        return answers[winner]
+    
     def send_reply(self, listing_id):
         """Send a reply message with the Yoodlize link."""
         try:
@@ -492,6 +744,11 @@ class FacebookMarketplaceResponder:
                 more_messages = False
                 break
             
+            # Resolve every unread thread's title up front in one request; threads
+            # handled on later passes are then answered from the lookup cache
+            previews = [self.extract_title_from_preview(thread) for thread in unread_threads]
+            self.resolve_titles_using_api([preview for preview in previews if preview])
+            
             try:
                 # Process just the first unread thread
                 thread = unread_threads[0]
@@ -507,20 +764,8 @@ class FacebookMarketplaceResponder:
                 title = listing_info.get("title")
                 city = listing_info.get("city")
                 
-                # Try to find the listing ID
-                listing_id = None
-                
-                # Method 1: Database lookup
-                if self.database_path:
-                    listing_id = self.find_listing_id_in_database(title, city)
-                
-                # Method 2: API lookup
-                if not listing_id:
-                    listing_id = self.find_listing_id_using_api(title, city)
-                
-                # Method 3: CSV lookup
-                if not listing_id:
-                    listing_id = self.find_listing_id_in_csv_files(title)
+                # Try to find the listing ID (database, API and CSV queried at once)
+                listing_id = self.resolve_listing_id(title, city)
                 
                 # If we found a listing ID, send a reply
                 if listing_id:
@@ -557,6 +802,12 @@ class FacebookMarketplaceResponder:
             return 0
         
         finally:
+            self.api_cache.save()
+            print(self.api_cache.summary())
+            for line in self.lookup_stats.summary():
+                print(line)
+            for line in get_client().latency_report():
+                print(line)
             print("[👋] Completing Facebook Marketplace message processing")
             # Don't close the browser - let the calling code decide
 
@@ -0,0 +1,165 @@
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, NoAlertPresentException
+
+# Wait settings; a wait returns as soon as its condition holds, these are only the upper bounds
+WAIT_TIMEOUT = 5  # Seconds for an element, dropdown or dialog
+NAVIGATION_TIMEOUT = 15  # Seconds for a page load
+UPLOAD_TIMEOUT = 10  # Seconds for an uploaded image's thumbnail to render
+DIALOG_TIMEOUT = 1  # Seconds for a dismissed dialog to close
+POLL_INTERVAL = 0.05  # Seconds between checks of a condition
+
+class WaitStats:
+    """Durations of the waits done while posting one listing, grouped by label."""
+
+    def __init__(self):
+        self.waits = []
+
+    def record(self, label, seconds, timed_out):
+        """Record one finished wait."""
+        self.waits.append((label, seconds, timed_out))
+
+    def reset(self):
+        """Forget the waits recorded so far."""
+        self.waits = []
+
+    def total(self):
+        """Return the total seconds spent waiting."""
+        return sum(seconds for _, seconds, _ in self.waits)
+
+    def summary(self):
+        """Return a one-line summary: count, total time, timeouts and the slowest wait."""
+        if not self.waits:
+            return "no waits"
+        label, seconds, _ = max(self.waits, key=lambda wait: wait[1])
+        timeouts = sum(1 for wait in self.waits if wait[2])
+        return (f"{len(self.waits)} waits in {self.total():.2f}s, {timeouts} timed out, "
+                f"slowest: {label} ({seconds:.2f}s)")
+
+wait_stats = WaitStats()
+
+def wait_for(driver, condition, label, timeout=WAIT_TIMEOUT, debug=False):
+    """
+    Wait until condition(driver) returns something truthy and return it.
+    Returns None on timeout instead of raising, so callers keep their own fallbacks.
+    """
+    start = time.monotonic()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL,
+                               ignored_exceptions=(StaleElementReferenceException,)).until(condition)
+        timed_out = False
+    except TimeoutException:
+        result = None
+        timed_out = True
+    seconds = time.monotonic() - start
+    wait_stats.record(label, seconds, timed_out)
+
+    if timed_out:
+        print(f"[⏱️] Gave up waiting for {label} after {seconds:.2f}s")
+    elif debug:
+        print(f"[⏱️] Waited {seconds:.2f}s for {label}")
+    return result
+
+# Conditions: each takes the driver and returns a truthy value once it holds
+
+def element_present(locator):
+    """The first element matching locator is in the DOM (it may be hidden, like file inputs)."""
+    def condition(driver):
+        elements = driver.find_elements(*locator)
+        return elements[0] if elements else False
+    return condition
+
+def element_ready(locator):
+    """An element matching locator is displayed and enabled."""
+    def condition(driver):
+        for element in driver.find_elements(*locator):
+            if element.is_displayed() and element.is_enabled():
+                return element
+        return False
+    return condition
+
+def text_visible(text):
+    """An element containing text is displayed."""
+    return element_ready((By.XPATH, f"//*[contains(text(), '{text}')]"))
+
+def element_in_view(element):
+    """A (smooth-)scrolled element has come to rest inside the viewport."""
+    def condition(driver):
+        return driver.execute_script("""
+            var rect = arguments[0].getBoundingClientRect();
+            return rect.top >= 0 && rect.bottom <= window.innerHeight;
+        """, element) and element
+    return condition
+
+def element_focused(element):
+    """An element has keyboard focus."""
+    def condition(driver):
+        return driver.execute_script("return document.activeElement === arguments[0];", element)
+    return condition
+
+def element_gone(element):
+    """An element was removed from the page or hidden, e.g. a closed dialog."""
+    def condition(driver):
+        try:
+            return not element.is_displayed()
+        except StaleElementReferenceException:
+            return True
+    return condition
+
+def enclosing_dialog(driver, element):
+    """Return the [role="dialog"] container of an element, or the element itself if it is not in one."""
+    return driver.execute_script("return arguments[0].closest('[role=\"dialog\"]') || arguments[0];", element)
+
+def value_equals(element, value):
+    """An input holds the given value."""
+    def condition(driver):
+        return driver.execute_script("return arguments[0].value;", element) == value
+    return condition
+
+def dropdown_open():
+    """A listbox or menu of options is displayed; returns its first visible option."""
+    def condition(driver):
+        return driver.execute_script("""
+            var options = document.querySelectorAll('[role="listbox"] [role="option"], [role="menu"] [role="menuitem"], [role="option"]');
+            for (var i = 0; i < options.length; i++) {
+                if (options[i].offsetParent !== null) return options[i];
+            }
+            return null;
+        """) or False
+    return condition
+
+def count_thumbnails(driver):
+    """Return the number of rendered image previews (blob: or data: images) on the page."""
+    return driver.execute_script("""
+        var images = document.querySelectorAll('img[src^="blob:"], img[src^="data:image"]');
+        var rendered = 0;
+        for (var i = 0; i < images.length; i++) {
+            if (images[i].complete && images[i].naturalWidth > 0) rendered++;
+        }
+        return rendered;
+    """)
+
+def thumbnails_rendered(count):
+    """At least count uploaded image thumbnails have rendered."""
+    def condition(driver):
+        return count_thumbnails(driver) >= count
+    return condition
+
+def navigation_finished(previous_url=None):
+    """The document has finished loading, and the URL has changed if previous_url is given."""
+    def condition(driver):
+        if previous_url is not None and driver.current_url == previous_url:
+            return False
+        return driver.execute_script("return document.readyState;") == "complete"
+    return condition
+
+def alert_closed():
+    """No browser alert is open."""
+    def condition(driver):
+        try:
+            driver.switch_to.alert
+            return False
+        except NoAlertPresentException:
+            return True
+    return condition